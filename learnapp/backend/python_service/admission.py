@@ -0,0 +1,166 @@
+# backend/python-service/admission.py
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import metrics
+
+# Lanes in priority order: a free slot always goes to a waiting interactive
+# request before a batch one
+LANES = ("interactive", "batch")
+
+
+class Overloaded(Exception):
+    """The lane's queue is full; the client should back off and retry (HTTP 503)."""
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before its work could run (HTTP 504)."""
+
+
+class ArrivalTimeMiddleware:
+    """
+    Stamp each request with its arrival time (request.state.received_at) before
+    the upload body is read, so time spent receiving it counts toward the deadline.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["received_at"] = time.monotonic()
+        await self.app(scope, receive, send)
+
+
+def check_deadline(deadline: float):
+    """Raise DeadlineExceeded if the deadline (time.monotonic() seconds) has passed."""
+    if time.monotonic() >= deadline:
+        raise DeadlineExceeded("Request deadline passed before the analysis could run")
+
+
+class Ticket:
+    """
+    One caller's claim on the admission queue: its lane and monotonic deadline.
+
+    Coalesced duplicates share one computation, which runs on a merged ticket
+    (see merge()) while every caller still waits for the result only until its
+    own deadline (see wait()).
+    """
+    def __init__(self, controller, lane: str, deadline: float):
+        self.controller = controller
+        self.lane = lane
+        self.deadline = deadline
+        self._waiter = None     # set while queued in the controller
+
+    def copy(self):
+        return Ticket(self.controller, self.lane, self.deadline)
+
+    def merge(self, other):
+        """Widen this ticket to cover another caller: the later deadline and the higher-priority lane."""
+        self.deadline = max(self.deadline, other.deadline)
+        if LANES.index(other.lane) < LANES.index(self.lane):
+            self.controller._move(self, other.lane)
+
+    async def wait(self, awaitable):
+        """
+        Await awaitable until this ticket's deadline; DeadlineExceeded after that.
+        Expiries are counted here ("admission_expired"), once per caller.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, timeout=max(0.0, self.deadline - time.monotonic()))
+        except (asyncio.TimeoutError, DeadlineExceeded) as e:
+            metrics.increment("admission_expired")
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded("Request deadline passed before the analysis finished") from None
+
+
+class AdmissionController:
+    """
+    Bounds how many analyses run at once, with a bounded priority queue in front.
+
+    A request either gets a slot straight away or waits in its lane's queue until
+    a slot is handed to it, its deadline passes (DeadlineExceeded, so no work is
+    done for a client that has already given up) or, if the queue is already
+    full, is turned away immediately (Overloaded). A queued ticket's deadline may
+    be extended and its lane raised while it waits (Ticket.merge). Lives on one
+    event loop, so no locking is needed.
+    """
+    def __init__(self, max_concurrent: int, max_queued: dict):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.active = 0
+        self._waiters = {lane: deque() for lane in LANES}
+
+    def ticket(self, lane: str, deadline: float):
+        return Ticket(self, lane, deadline)
+
+    def queued(self):
+        return {lane: sum(not waiter.done() for waiter in waiters) for lane, waiters in self._waiters.items()}
+
+    def stats(self):
+        return {"active": self.active, "max_concurrent": self.max_concurrent, "queued": self.queued()}
+
+    def _move(self, ticket: Ticket, lane: str):
+        """Change a ticket's lane, moving it to the back of the new lane's queue if it is waiting."""
+        waiter = ticket._waiter
+        if waiter is not None and not waiter.done():
+            self._waiters[ticket.lane].remove(waiter)
+            self._waiters[lane].append(waiter)
+        ticket.lane = lane
+
+    async def acquire(self, ticket: Ticket):
+        check_deadline(ticket.deadline)
+        if self.active < self.max_concurrent and not any(self._waiters.values()):
+            self.active += 1
+            return
+
+        if len(self._waiters[ticket.lane]) >= self.max_queued[ticket.lane]:
+            metrics.increment(f"admission_rejected_{ticket.lane}")
+            raise Overloaded(f"Too many {ticket.lane} requests waiting")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[ticket.lane].append(waiter)
+        ticket._waiter = waiter
+        try:
+            # Re-armed when the deadline was extended while we waited
+            while not waiter.done():
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout=max(0.0, ticket.deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    if not waiter.done() and time.monotonic() >= ticket.deadline:
+                        self._waiters[ticket.lane].remove(waiter)
+                        raise DeadlineExceeded("Request deadline passed while waiting for a free slot") from None
+        except asyncio.CancelledError:
+            if waiter.done():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                self._waiters[ticket.lane].remove(waiter)
+            raise
+        finally:
+            ticket._waiter = None
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or free it."""
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, ticket: Ticket):
+        """Hold one of the concurrent slots for the enclosed block (queue wait goes to "queue_wait_<lane>")."""
+        started = time.perf_counter()
+        await self.acquire(ticket)
+        metrics.observe(f"queue_wait_{ticket.lane}", time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self.release()
@@ -5,6 +5,7 @@ import librosa
 import os
 from numpy import dot
 from numpy.linalg import norm
+from features import extract_features
 
 # Note: Removed unnecessary imports like matplotlib and scipy.io for server stability.
 
@@ -17,41 +18,27 @@ class AdvancedPronunciationAnalyzer:
         # Standard sample rate for speech processing
         self.sample_rate = 16000
         
-    def extract_audio_features(self, audio_data: np.ndarray):
+    def extract_audio_features(self, audio_data: np.ndarray, out=None):
         """
         Extracts MFCCs and spectral features from a raw NumPy audio array.
 
         Args:
             audio_data (np.ndarray): The raw audio signal (as a NumPy array) 
                                      loaded by librosa in main.py.
+            out (np.void): Optional record to fill in place (a row of a feature batch).
 
         Returns:
-            dict: A dictionary containing mean MFCCs, spectral centroid, and rolloff, 
-                  or None if an error occurs.
+            np.void: A FEATURE_DTYPE record (float32) with mean/std MFCCs, spectral centroid,
+                     rolloff, zero-crossing rate, energy and duration, or None if an error occurs.
         """
         try:
             # 1. Convert to float (required by librosa)
             # The audio data is expected to be a float array from librosa.load()
-            audio_float = audio_data.astype(np.float32)
+            audio_float = audio_data.astype(np.float32, copy=False)
             
-            # 2. Extract MFCC features (13 coefficients is standard)
+            # 2. Extract MFCC features (13 coefficients is standard) and spectral features.
             # MFCCs are the key features for the trained model.
-            mfccs = librosa.feature.mfcc(y=audio_float, sr=self.sample_rate, n_mfcc=13)
-            
-            # 3. Extract spectral features (for additional context/optional use)
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_float, sr=self.sample_rate)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_float, sr=self.sample_rate)
-            
-            features = {
-                # The mean of MFCCs over time is the 13-feature vector used by our classifier
-                'mfcc_mean': np.mean(mfccs, axis=1),
-                'mfcc_std': np.std(mfccs, axis=1),
-                'spectral_centroid': np.mean(spectral_centroid),
-                'spectral_rolloff': np.mean(spectral_rolloff),
-                'duration': len(audio_float) / self.sample_rate
-            }
-            
-            return features
+            return extract_features(audio_float, self.sample_rate, out=out)
             
         except Exception as e:
             # This will catch librosa or numpy errors and report them to main.py
@@ -70,7 +57,7 @@ class AdvancedPronunciationAnalyzer:
     
     def compare_pronunciation(self, reference_features, user_features):
         """Compares features (for legacy/rule-based scoring, not used by trained model)."""
-        if not reference_features or not user_features:
+        if reference_features is None or user_features is None:
             return 0.0
         
         # Example of how the features could be combined manually if the ML model were unavailable
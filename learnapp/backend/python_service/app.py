@@ -1,30 +1,199 @@
 # backend/python-service/app.py
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
 import uvicorn
 import os
 import time
 import io
+import math
 import shutil
+import threading
+from collections import OrderedDict
 
 # CRITICAL IMPORT: This imports the analysis function from main.py
-from main import analyze_pronunciation_for_api 
+from main import analyze_audio_for_api 
+from features import AnalysisResult
+from decoding import AudioDecoder, DecodeError
+import metrics
+from coalescing import SingleFlight, upload_key
+from admission import AdmissionController, ArrivalTimeMiddleware, DeadlineExceeded, Overloaded, Ticket, check_deadline
+from attempt_store import AttemptStore
+from scheduler import SpacedRepetitionScheduler
+from lexicon import Lexicon
+import worker_stats
+import memory_guard
+import warmup
+from config import ATTEMPT_STORE_SETTINGS, SCHEDULER_SETTINGS, LEXICON_SETTINGS, RECOGNITION_SETTINGS, DECODER_SETTINGS
+from config import ADMISSION_SETTINGS, PROGRESS_SETTINGS
 
 # Initialize the FastAPI application object
 app = FastAPI()
+app.add_middleware(ArrivalTimeMiddleware)
+
+# Persistent log of every scored attempt (per-user progress and per-word aggregates)
+ATTEMPT_STORE = AttemptStore(**ATTEMPT_STORE_SETTINGS)
+
+# Decode stage: PCM in-process, compressed uploads in long-lived decoder processes
+AUDIO_DECODER = AudioDecoder(**DECODER_SETTINGS)
+
+# Bounded concurrent analyses, with interactive requests admitted ahead of batch ones
+ADMISSION = AdmissionController(ADMISSION_SETTINGS["max_concurrent"], ADMISSION_SETTINGS["max_queued"])
+
+# Identical concurrent uploads (same audio bytes and target word) share one analysis
+ANALYSIS_FLIGHTS = SingleFlight("analysis")
+
+# Word lexicon (opened lazily on first lookup)
+LEXICON = Lexicon(**LEXICON_SETTINGS)
+
+# Per-user spaced-repetition schedules, least recently used evicted first.
+# SCHEDULERS_LOCK only guards the dict; each learner's schedule has its own lock,
+# so rebuilding one learner's schedule from a long history never blocks the others.
+# The attempt log is the source of truth: attempts may be scored by any server
+# worker, so a cached schedule replays the rows it has not seen yet on every read.
+SCHEDULERS = OrderedDict()
+SCHEDULERS_LOCK = threading.Lock()
+
+class LearnerSchedule:
+    """A cached scheduler, the last attempt id applied to it, and the lock that serialises access."""
+    __slots__ = ("lock", "scheduler", "last_attempt_id")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scheduler = None
+        self.last_attempt_id = 0
+
+def get_schedule(user_id: str):
+    """
+    Return the user's LearnerSchedule, brought up to date with the attempt log
+    (a full replay if it was not cached). Blocking (SQLite reads): call from a
+    worker thread.
+    """
+    with SCHEDULERS_LOCK:
+        schedule = SCHEDULERS.get(user_id)
+        if schedule is None:
+            schedule = SCHEDULERS[user_id] = LearnerSchedule()
+            if len(SCHEDULERS) > SCHEDULER_SETTINGS["max_cached_learners"]:
+                SCHEDULERS.popitem(last=False)
+        else:
+            SCHEDULERS.move_to_end(user_id)
+
+    with schedule.lock:
+        if schedule.scheduler is None:
+            schedule.scheduler = SpacedRepetitionScheduler(LEXICON)
+        for attempt_id, word, score, created_at in ATTEMPT_STORE.user_attempts_since(user_id, schedule.last_attempt_id):
+            schedule.scheduler.record_result(word, score, created_at)
+            schedule.last_attempt_id = attempt_id
+    return schedule
+
+def worker_ready():
+    """
+    True once the analysis path is warm and this worker's own decoder processes
+    have answered a ping (they are started per worker, after the fork).
+    """
+    return warmup.is_ready() and AUDIO_DECODER.is_warm()
+
+@app.on_event("startup")
+def start_warm_up():
+    """Warm up in the background (a no-op in workers forked from an already warm master)."""
+    warmup.start_background_warm_up()
+    # Decoder processes belong to each worker, so they are started here rather than in the master
+    threading.Thread(target=AUDIO_DECODER.warm_up, name="decoder-warm-up", daemon=True).start()
+    # RSS sampling (and recycling on excessive growth) for this worker, with
+    # growth measured from the end of warm-up
+    memory_guard.start(is_ready=worker_ready)
+
+@app.on_event("shutdown")
+def close_attempt_store():
+    """Commit any queued attempts and stop the decoder processes before the process exits."""
+    ATTEMPT_STORE.close()
+    AUDIO_DECODER.shutdown()
 
 # --- Health Check ---
+# Cheap endpoints are async so they answer on the event loop and never wait for
+# a thread behind the analyses
 @app.get("/")
-def home():
+async def home():
     """Simple health check endpoint."""
     return {"message": "AI Pronunciation Service is running!"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the analysis path and this worker's decoder processes are warm."""
+    warmup.start_background_warm_up()
+    body = {"ready": worker_ready(), "warmup": warmup.WARMUP_STATE, "decoders_warm": AUDIO_DECODER.is_warm()}
+    return JSONResponse(content=body, status_code=200 if body["ready"] else 503)
+
+@app.get("/workers")
+def workers():
+    """Server processes with their warm-up/boot time and current memory (RSS, shared vs private)."""
+    return {"served_by": os.getpid(), "processes": worker_stats.collect()}
+
+@app.get("/metrics")
+async def service_metrics():
+    """Counters and latency timers (e.g. decode time per format) of the worker that answers."""
+    return {
+        "pid": os.getpid(),
+        "analyses_in_flight": ANALYSIS_FLIGHTS.in_flight(),
+        "admission": ADMISSION.stats(),
+        **metrics.snapshot()
+    }
+
+@app.get("/debug/memory")
+def debug_memory(limit: int = 10):
+    """This worker's RSS history and growth, and its top allocators when tracemalloc is on."""
+    return memory_guard.report(limit=limit)
+
+def request_deadline(request: Request):
+    """
+    Monotonic deadline from the client's X-Request-Timeout-Ms header (or the default), counted from arrival.
+    Timeouts that are not a positive finite number are rejected (400); long ones are clamped to max_timeout.
+    """
+    received_at = getattr(request.state, "received_at", None) or time.monotonic()
+    header = request.headers.get("x-request-timeout-ms")
+    if header is None:
+        return received_at + ADMISSION_SETTINGS["default_timeout"]
+    try:
+        timeout = float(header) / 1000
+    except ValueError:
+        timeout = math.nan
+    if not math.isfinite(timeout) or timeout <= 0:
+        raise HTTPException(status_code=400, detail=f"Invalid X-Request-Timeout-Ms: {header!r}")
+    return received_at + min(timeout, ADMISSION_SETTINGS["max_timeout"])
+
+def request_lane(request: Request, upload_size: int):
+    """Batch lane for clients that ask for it (X-Priority: batch) and for long clips, interactive otherwise."""
+    if request.headers.get("x-priority", "").lower() == "batch" or upload_size > ADMISSION_SETTINGS["short_clip_bytes"]:
+        return "batch"
+    return "interactive"
+
+async def decode_and_analyze(file_contents: bytes, content_type: str, target_word: str, ticket: Ticket):
+    """
+    Decode an upload to 16 kHz mono PCM and score it (shared by coalesced duplicate
+    requests; ticket is their merged lane and deadline).
+    """
+    async with ADMISSION.slot(ticket):
+        # WAV in a thread, compressed formats in the long-lived decoder processes
+        try:
+            samples = await AUDIO_DECODER.decode_async(file_contents, content_type, ticket.deadline)
+        except DecodeError as e:
+            return AnalysisResult(0.0, f"Audio processing failed (decoder): {e}", target_word)
+
+        # Skip inference if every client gave up while the audio was decoding
+        check_deadline(ticket.deadline)
+
+        # Call the AI model function from main.py (in a worker thread, off the event loop)
+        return await run_in_threadpool(analyze_audio_for_api, samples, target_word)
+
 # --- Main Analysis Endpoint ---
 @app.post("/analyze/")
 async def analyze(
+    request: Request,
     file: UploadFile = File(..., description="The user's audio recording (WAV or MP3)"),
-    target_word: str = Form(..., description="The word the user was asked to pronounce")
+    target_word: str = Form(..., description="The word the user was asked to pronounce"),
+    user_id: Optional[str] = Form(None, description="Optional learner id; scored attempts are logged under it")
 ):
     """
     Endpoint to receive audio, analyze pronunciation, and return score/feedback.
@@ -35,37 +204,96 @@ async def analyze(
     if file.content_type not in ["audio/wav", "audio/mp3", "audio/mpeg", "audio/m4a"]:
         raise HTTPException(status_code=400, detail=f"Invalid file type: {file.content_type}. Expected audio/wav, audio/m4a, or audio/mp3.")
 
-    # Use the current time to ensure a unique temporary filename
-    temp_file_name = f"temp_{int(time.time())}_{file.filename}"
-    temp_file_path = os.path.join(os.getcwd(), temp_file_name)
-    
-    # 2. Save uploaded audio temporarily (Robust Method)
+    deadline = request_deadline(request)
+    started = time.perf_counter()
     try:
-        # Read the file content asynchronously (more reliable in FastAPI)
+        # 2. Read the upload
         file_contents = await file.read()
-        
-        # Write the content synchronously to the temporary file path
-        with open(temp_file_path, "wb") as buffer:
-            buffer.write(file_contents)
-            
-        # 3. Call the AI model function from main.py
-        # This function processes the file at the temporary path
-        analysis_result = analyze_pronunciation_for_api(temp_file_path, target_word)
-
-        # 4. Return the results
-        return JSONResponse(content=analysis_result)
 
+        # 3. Decode and score it once a slot is free. A double-submit or a clip many
+        # learners send at once is analysed only once: concurrent duplicates await
+        # the same result, which is queued at the highest lane and latest deadline
+        # among them; each request still times out (504) on its own deadline only.
+        ticket = ADMISSION.ticket(request_lane(request, len(file_contents)), deadline)
+        analysis_result = await ANALYSIS_FLIGHTS.do(
+            upload_key(file_contents, target_word),
+            decode_and_analyze, file_contents, file.content_type, target_word,
+            ticket=ticket
+        )
+        del file_contents
+
+        # Only attempts the model actually scored carry a features digest
+        if user_id and analysis_result.features_digest:
+            # Queued for the writer thread; schedules pick it up from the log on their next read
+            ATTEMPT_STORE.record_attempt(user_id, target_word, analysis_result.score, analysis_result.features_digest)
+
+        metrics.observe("analyze", time.perf_counter() - started)
+
+        # 4. Return the results (serialized directly, no intermediate dict for FastAPI to encode)
+        return Response(content=analysis_result.to_json(), media_type="application/json")
+
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         # Log the error detail for debugging in the Python console
         print(f"FATAL ERROR during analysis processing for {target_word}: {e}")
         # Return a standard server error response to the client
         raise HTTPException(status_code=500, detail=f"Internal Server Error during AI analysis: {e}")
-    
-    finally:
-        # 5. Clean up the temporary file (CRITICAL step)
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-            # print(f"Cleaned up {temp_file_name}") # Optional debug line
+
+# --- Progress Endpoints ---
+def clamp_limit(limit: int):
+    """A row limit within 1..max_limit (SQLite reads LIMIT -1 as "no limit")."""
+    return max(1, min(limit, PROGRESS_SETTINGS["max_limit"]))
+
+@app.get("/users/{user_id}/weakest-words")
+def weakest_words(user_id: str, limit: int = 10, min_attempts: int = 1):
+    """The user's words with the lowest average score, weakest first."""
+    words = ATTEMPT_STORE.weakest_words(user_id, limit=clamp_limit(limit), min_attempts=max(1, min_attempts))
+    return {"user_id": user_id, "words": words}
+
+@app.get("/users/{user_id}/history")
+def attempt_history(user_id: str, limit: int = 50):
+    """The user's most recent scored attempts, newest first."""
+    return {"user_id": user_id, "attempts": ATTEMPT_STORE.user_history(user_id, limit=clamp_limit(limit))}
+
+@app.get("/users/{user_id}/next-word")
+def next_word(user_id: str):
+    """The word this user should practise next, chosen by spaced repetition."""
+    schedule = get_schedule(user_id)
+    with schedule.lock:
+        scheduler = schedule.scheduler
+        entry = scheduler.next_word()
+        if entry is None:
+            raise HTTPException(status_code=404, detail="The word bank is empty.")
+        return {
+            "user_id": user_id,
+            "word": entry,
+            "max_attempts": scheduler.max_attempts(entry["word"], base=RECOGNITION_SETTINGS["max_attempts"]),
+            "schedule": scheduler.word_state(entry["word"])
+        }
+
+@app.get("/words/{word}")
+def word_entry(word: str):
+    """Lexicon entry for a word (IPA, difficulty, category and accepted variants)."""
+    entry = LEXICON.get(word)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"'{word}' is not in the lexicon.")
+    return {**entry, "variants": LEXICON.variants(word)}
+
+@app.get("/categories/{category}/words")
+def category_words(category: str, difficulty: Optional[str] = None, limit: int = 100):
+    """Lexicon entries in a category, optionally filtered by difficulty."""
+    return {"category": category, "words": LEXICON.words_in_category(category, difficulty=difficulty, limit=limit)}
+
+@app.get("/words/{word}/stats")
+def word_stats(word: str):
+    """Attempt count and average score for a word across all users."""
+    stats = ATTEMPT_STORE.word_stats(word)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No attempts recorded for '{word}'.")
+    return stats
 
 if __name__ == "__main__":
     # Runs the server locally. Host 0.0.0.0 makes it accessible to external devices/emulators
@@ -0,0 +1,230 @@
+# backend/python-service/attempt_store.py
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Schema notes:
+# - `attempts` is append-only: one row per scored attempt, never updated.
+# - `user_word_stats` and `word_stats` are running aggregates maintained by
+#   triggers, so "weakest words" never has to scan the raw attempt log.
+# - The (user_id, mean_score) index lets SQLite walk a user's words already
+#   sorted by score, so the query stays in the millisecond range no matter
+#   how many millions of attempt rows have been logged.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    word TEXT NOT NULL,
+    score REAL NOT NULL,
+    features_digest TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_user_time ON attempts (user_id, created_at);
+-- Per-word figures come from word_stats; an index on attempts (word) would only slow inserts
+DROP INDEX IF EXISTS idx_attempts_word;
+CREATE INDEX IF NOT EXISTS idx_attempts_user_id ON attempts (user_id, id);
+
+CREATE TABLE IF NOT EXISTS user_word_stats (
+    user_id TEXT NOT NULL,
+    word TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    total_score REAL NOT NULL,
+    mean_score REAL NOT NULL,
+    best_score REAL NOT NULL,
+    last_score REAL NOT NULL,
+    last_attempt_at REAL NOT NULL,
+    PRIMARY KEY (user_id, word)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_word_stats_mean ON user_word_stats (user_id, mean_score);
+
+CREATE TABLE IF NOT EXISTS word_stats (
+    word TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    total_score REAL NOT NULL,
+    mean_score REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_attempts_aggregate AFTER INSERT ON attempts
+BEGIN
+    INSERT INTO user_word_stats
+        (user_id, word, attempts, total_score, mean_score, best_score, last_score, last_attempt_at)
+    VALUES
+        (NEW.user_id, NEW.word, 1, NEW.score, NEW.score, NEW.score, NEW.score, NEW.created_at)
+    ON CONFLICT (user_id, word) DO UPDATE SET
+        attempts = attempts + 1,
+        total_score = total_score + NEW.score,
+        mean_score = (total_score + NEW.score) / (attempts + 1),
+        best_score = MAX(best_score, NEW.score),
+        last_score = NEW.score,
+        last_attempt_at = NEW.created_at;
+
+    INSERT INTO word_stats (word, attempts, total_score, mean_score)
+    VALUES (NEW.word, 1, NEW.score, NEW.score)
+    ON CONFLICT (word) DO UPDATE SET
+        attempts = attempts + 1,
+        total_score = total_score + NEW.score,
+        mean_score = (total_score + NEW.score) / (attempts + 1);
+END;
+"""
+
+# Sentinel placed on the queue to stop the writer thread
+_STOP = object()
+
+
+class AttemptStore:
+    """
+    Append-only log of scored pronunciation attempts backed by SQLite in WAL mode.
+
+    Writes are queued and committed by a single background thread in batches
+    (group commit), so request handlers never wait on disk I/O. Reads use a
+    per-thread connection and can run concurrently with the writer thanks to WAL.
+
+    The writer thread and connections are created lazily in the process that
+    uses them, so a store created before the server forks its workers is safe:
+    each worker starts its own writer on its first attempt.
+    """
+    def __init__(self, db_path: str, batch_size: int = 256, flush_interval: float = 0.05):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = None
+        self._writer = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+
+        # Create the schema once up-front so readers never see a missing table
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _ensure_writer(self):
+        """Start this process's writer thread (again after a fork, since threads don't survive it)."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._writer_loop, args=(self._queue,), name="attempt-store-writer", daemon=True)
+            self._writer.start()
+            self._pid = os.getpid()
+
+    def _connect(self):
+        """Open a connection tuned for a single-writer / many-reader workload."""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable against application crashes in WAL mode and avoids an fsync per commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        """Return the calling thread's read connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited across fork must not be used by the child
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # --- Writes ---
+
+    def record_attempt(self, user_id: str, word: str, score: float, features_digest: str = None, timestamp: float = None):
+        """Queue a scored attempt for the background writer. Never blocks on disk."""
+        created_at = timestamp if timestamp is not None else time.time()
+        self._ensure_writer()
+        self._queue.put((user_id, word.lower(), float(score), features_digest, created_at))
+
+    def _writer_loop(self, pending):
+        conn = self._connect()
+        running = True
+
+        while running:
+            # 1. Block until at least one attempt (or the stop signal) arrives
+            item = pending.get()
+            if item is _STOP:
+                break
+            batch = [item]
+
+            # 2. Gather whatever else arrives within the flush window, up to batch_size
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    running = False
+                    break
+                batch.append(item)
+
+            # 3. Commit the whole batch in a single transaction
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO attempts (user_id, word, score, features_digest, created_at) VALUES (?, ?, ?, ?, ?)",
+                        batch
+                    )
+            except sqlite3.Error as e:
+                print(f"ERROR: Could not write {len(batch)} attempts to {self.db_path}: {e}")
+
+        conn.close()
+
+    def close(self):
+        """Flush pending attempts and stop the writer thread."""
+        if self._pid == os.getpid() and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    # --- Reads ---
+
+    def user_history(self, user_id: str, limit: int = 50):
+        """Most recent attempts for a user, newest first."""
+        rows = self._reader().execute(
+            "SELECT word, score, features_digest, created_at FROM attempts "
+            "WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def user_attempts_since(self, user_id: str, after_id: int = 0):
+        """
+        (id, word, score, created_at) for a user's attempts with id > after_id, in
+        the order they were stored. Lets a cached schedule catch up with attempts
+        written by other server processes.
+        """
+        rows = self._reader().execute(
+            "SELECT id, word, score, created_at FROM attempts WHERE user_id = ? AND id > ? ORDER BY id",
+            (user_id, after_id)
+        ).fetchall()
+        return [(row["id"], row["word"], row["score"], row["created_at"]) for row in rows]
+
+    def weakest_words(self, user_id: str, limit: int = 10, min_attempts: int = 1):
+        """A user's words with the lowest mean score, served from the aggregate index."""
+        rows = self._reader().execute(
+            "SELECT word, attempts, mean_score, best_score, last_score, last_attempt_at "
+            "FROM user_word_stats WHERE user_id = ? AND attempts >= ? "
+            "ORDER BY mean_score ASC LIMIT ?",
+            (user_id, min_attempts, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def word_stats(self, word: str):
+        """Aggregate score for a word across all users, or None if never attempted."""
+        row = self._reader().execute(
+            "SELECT word, attempts, mean_score FROM word_stats WHERE word = ?",
+            (word.lower(),)
+        ).fetchone()
+        return dict(row) if row else None
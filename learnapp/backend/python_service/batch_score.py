@@ -0,0 +1,403 @@
+# backend/python-service/batch_score.py
+
+"""
+Offline batch scoring: run a trained model over a whole audio corpus.
+
+    python batch_score.py CORPUS_DIR_OR_MANIFEST.csv --output scores.csv
+    python batch_score.py manifest.csv --output scores.parquet --model new_model.joblib
+
+Input is either
+  * a CSV manifest with columns audio, target_word and optionally label
+    (audio paths are relative to the manifest), or
+  * a directory laid out as <target_word>/<clip> or <target_word>/<label>/<clip>.
+Labels may be 1/0, good/bad, correct/incorrect or true/false.
+
+Files are streamed through decode and feature extraction on all cores, and the
+model scores each chunk of features in one call. Only two chunks are held in
+memory at a time, so the corpus can be larger than RAM. Results are appended
+chunk by chunk; running the same command again skips everything already scored
+in the output, so an interrupted run resumes where it stopped. Clips whose
+file could not be read are tried again; clips that failed to decode or score
+are not, since they would only fail the same way (--retry-failed retries them
+too, e.g. after installing a codec). Earlier error rows stay; the latest row
+for a clip is the one that counts. When labels are present, accuracy and ROC
+AUC are printed at the end.
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+
+from config import BATCH_SETTINGS, WARMUP_SETTINGS
+
+# Same on-disk numba cache as the server (must be set before librosa is imported)
+os.environ.setdefault("NUMBA_CACHE_DIR", WARMUP_SETTINGS["numba_cache_dir"])
+
+import numpy as np
+from joblib import load
+
+from decoding import TARGET_SAMPLE_RATE, decode_compressed, decode_pcm, _warm_decoder
+from features import empty_feature_batch, extract_features
+
+DEFAULT_MODEL_PATH = "pronunciation_model.joblib"
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".m4a", ".mp3", ".aac", ".mp4"}
+PCM_EXTENSIONS = {".wav", ".flac", ".ogg"}
+
+LABELS = {
+    "1": 1, "good": 1, "correct": 1, "true": 1,
+    "0": 0, "bad": 0, "incorrect": 0, "false": 0
+}
+
+COLUMNS = ["audio", "target_word", "label", "score", "features_digest", "duration", "error"]
+
+# Errors reading a file (missing, permissions, a network mount...) may go away,
+# so these clips are retried on resume; decode and scoring errors are not
+READ_ERROR_PREFIX = "read failed: "
+
+# One clip to score: `audio` is the path as given (the key used for resuming),
+# `path` is where the file actually is
+Item = namedtuple("Item", ["audio", "path", "target_word", "label"])
+
+
+def parse_label(value):
+    """Map a label from a manifest or directory name to 1/0 (None when absent)."""
+    if value is None or str(value).strip() == "":
+        return None
+    label = LABELS.get(str(value).strip().lower())
+    if label is None:
+        raise ValueError(f"Unrecognised label {value!r}; expected one of {sorted(LABELS)}")
+    return label
+
+
+# --- Input ---
+
+def iter_directory(root: str):
+    """Clips under root/<target_word>/[<label>/]<clip>, in a stable order."""
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in AUDIO_EXTENSIONS:
+                continue
+            path = os.path.join(directory, filename)
+            audio = os.path.relpath(path, root)
+            parts = audio.split(os.sep)
+            if len(parts) < 2:
+                print(f"INFO: Skipping {audio}: not inside a <target_word> directory")
+                continue
+            label = None
+            if len(parts) >= 3 and parts[1].lower() in LABELS:
+                label = LABELS[parts[1].lower()]
+            yield Item(audio, path, parts[0], label)
+
+
+def iter_manifest(manifest_path: str):
+    """Clips listed in a CSV manifest, read row by row."""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = {"audio", "target_word"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Manifest {manifest_path} is missing column(s): {', '.join(sorted(missing))}")
+        for row in reader:
+            audio = row["audio"]
+            yield Item(audio, os.path.join(base, audio), row["target_word"], parse_label(row.get("label")))
+
+
+def iter_items(source: str):
+    if os.path.isdir(source):
+        return iter_directory(source)
+    return iter_manifest(source)
+
+
+def resume_keys(keyed_errors, retry_failed: bool = False):
+    """
+    Keys to skip on resume, from ((audio, target_word), error) pairs in the order
+    they were written: clips whose latest row succeeded or failed for good.
+    """
+    latest = {}
+    for key, error in keyed_errors:
+        latest[key] = error
+    return {
+        key for key, error in latest.items()
+        if not error or (not retry_failed and not error.startswith(READ_ERROR_PREFIX))
+    }
+
+
+# --- Output ---
+
+class CsvOutput:
+    """Scores appended to a CSV file, one flush per chunk."""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def _rows(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+
+    def _drop_partial_line(self):
+        """Cut off a partly written last line left by an interrupted run."""
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            # Scan back block by block for the end of the last complete line
+            position = end - 1
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            # Not even the header was written completely
+            f.truncate(0)
+
+    def done_keys(self, retry_failed: bool = False):
+        """(audio, target_word) of every clip not to score again (see resume_keys)."""
+        if os.path.exists(self.path):
+            self._drop_partial_line()
+        return resume_keys((((row["audio"], row["target_word"]), row["error"]) for row in self._rows()), retry_failed)
+
+    def write(self, rows):
+        if self._file is None:
+            write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+            if write_header:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def labelled_scores(self):
+        """(label, score) for every scored row that has a label."""
+        for row in self._rows():
+            if row["label"] != "" and row["score"] != "":
+                yield int(row["label"]), float(row["score"])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetOutput:
+    """Scores written as a directory of Parquet part files, one per chunk (needs pyarrow)."""
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead.")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._next_part = len(self._parts())
+
+    def _parts(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(".parquet"))
+
+    def _read(self, columns):
+        for name in self._parts():
+            yield self.pq.read_table(os.path.join(self.path, name), columns=columns)
+
+    def done_keys(self, retry_failed: bool = False):
+        def keyed_errors():
+            # Parts are read in the order they were written
+            for table in self._read(["audio", "target_word", "error"]):
+                for audio, target_word, error in zip(table.column("audio").to_pylist(),
+                                                     table.column("target_word").to_pylist(),
+                                                     table.column("error").to_pylist()):
+                    yield (audio, target_word), error
+        return resume_keys(keyed_errors(), retry_failed)
+
+    def write(self, rows):
+        schema = self.pa.schema([
+            ("audio", self.pa.string()), ("target_word", self.pa.string()), ("label", self.pa.int8()),
+            ("score", self.pa.float32()), ("features_digest", self.pa.string()),
+            ("duration", self.pa.float32()), ("error", self.pa.string())
+        ])
+        table = self.pa.Table.from_pylist(rows, schema=schema)
+        # Parts only appear complete: write to a temporary name, then rename
+        part_path = os.path.join(self.path, f"part-{self._next_part:06d}.parquet")
+        self.pq.write_table(table, part_path + ".tmp")
+        os.replace(part_path + ".tmp", part_path)
+        self._next_part += 1
+
+    def labelled_scores(self):
+        for table in self._read(["label", "score"]):
+            for label, score in zip(table.column("label").to_pylist(), table.column("score").to_pylist()):
+                if label is not None and score is not None:
+                    yield label, score
+
+    def close(self):
+        pass
+
+
+def open_output(path: str):
+    if path.endswith(".parquet"):
+        return ParquetOutput(path)
+    return CsvOutput(path)
+
+
+# --- Scoring ---
+
+def _extract(path: str):
+    """Decode one file and extract its features (runs in a worker process)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return None, f"{READ_ERROR_PREFIX}{type(e).__name__}: {e}"
+    try:
+        if os.path.splitext(path)[1].lower() in PCM_EXTENSIONS:
+            samples = decode_pcm(data)
+        else:
+            samples = decode_compressed(data)
+        del data
+        if len(samples) == 0:
+            return None, "empty audio"
+        return extract_features(samples, TARGET_SAMPLE_RATE), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def score_chunk(model, items, extracted):
+    """Score one chunk's features with a single model call and build its output rows."""
+    batch = empty_feature_batch(len(items))
+    errors = [None] * len(items)
+    ok = np.zeros(len(items), dtype=bool)
+    for i, (record, error) in enumerate(extracted):
+        if record is None:
+            errors[i] = error
+        else:
+            batch[i] = record
+            ok[i] = True
+
+    scores = np.full(len(items), np.nan)
+    if ok.any():
+        # Probability of class 1 ("correct"), as in analyze_audio_for_api
+        scores[ok] = model.predict_proba(batch["mfcc_mean"][ok])[:, 1]
+
+    rows = []
+    for i, item in enumerate(items):
+        row = {"audio": item.audio, "target_word": item.target_word, "label": item.label,
+               "score": None, "features_digest": None, "duration": None, "error": errors[i]}
+        if ok[i]:
+            # Rounded like the API's score (AnalysisResult.to_dict)
+            row["score"] = round(float(scores[i]), 2)
+            # Same digest the API stores with each attempt
+            row["features_digest"] = hashlib.sha1(batch["mfcc_mean"][i].reshape(1, -1).tobytes()).hexdigest()
+            row["duration"] = round(float(batch["duration"][i]), 3)
+        rows.append(row)
+    return rows
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(source: str, output_path: str, model_path: str = DEFAULT_MODEL_PATH,
+        workers: int = None, chunk_size: int = None, threshold: float = None, retry_failed: bool = False):
+    """Score every clip in source that is not yet in the output, then report metrics."""
+    workers = workers or BATCH_SETTINGS["workers"]
+    chunk_size = chunk_size or BATCH_SETTINGS["chunk_size"]
+    threshold = BATCH_SETTINGS["threshold"] if threshold is None else threshold
+
+    model = load(model_path)
+    print(f"Loaded model from {model_path}")
+
+    output = open_output(output_path)
+    done = output.done_keys(retry_failed)
+    if done:
+        print(f"Resuming: {len(done)} clips already done in {output_path}")
+    todo = (item for item in iter_items(source) if (item.audio, item.target_word) not in done)
+
+    scored = failed = 0
+    started = time.perf_counter()
+    # Workers only decode and extract features; the model stays in this process
+    with multiprocessing.Pool(workers, initializer=_warm_decoder) as pool:
+        in_flight = None
+        # While one chunk is being decoded by the pool, the previous one is scored and written
+        for chunk in itertools.chain(chunked(todo, chunk_size), [None]):
+            submitted = None
+            if chunk is not None:
+                submitted = (chunk, pool.map_async(_extract, [item.path for item in chunk],
+                                                   chunksize=max(1, len(chunk) // (workers * 4))))
+            if in_flight is not None:
+                items, result = in_flight
+                rows = score_chunk(model, items, result.get())
+                output.write(rows)
+                scored += len(rows)
+                failed += sum(row["error"] is not None for row in rows)
+                elapsed = time.perf_counter() - started
+                print(f"Scored {scored} clips ({failed} failed), {scored / elapsed:.1f} clips/s")
+            in_flight = submitted
+    output.close()
+
+    metrics = evaluate(output, threshold)
+    if metrics:
+        print(f"Labelled clips: {metrics['count']}")
+        print(f"Accuracy (score >= {threshold}): {metrics['accuracy']:.3f}")
+        if metrics["auc"] is not None:
+            print(f"ROC AUC: {metrics['auc']:.3f}")
+    return metrics
+
+
+def evaluate(output, threshold: float):
+    """Accuracy and ROC AUC over every labelled row in the output (None without labels)."""
+    pairs = np.fromiter(itertools.chain.from_iterable(output.labelled_scores()), dtype=np.float64)
+    if pairs.size == 0:
+        return None
+    labels, scores = pairs[0::2].astype(np.int8), pairs[1::2]
+
+    auc = None
+    if len(np.unique(labels)) == 2:
+        from sklearn.metrics import roc_auc_score
+        auc = float(roc_auc_score(labels, scores))
+    return {
+        "count": int(labels.size),
+        "accuracy": float(np.mean((scores >= threshold) == labels)),
+        "auc": auc
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score an audio corpus offline with a pronunciation model.")
+    parser.add_argument("source", help="CSV manifest (audio, target_word[, label]) or corpus directory")
+    parser.add_argument("--output", "-o", required=True, help="scores.csv, or scores.parquet (a directory of parts)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="joblib model file from train_model.py")
+    parser.add_argument("--workers", type=int, default=None, help="decode/feature processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="files scored per model call")
+    parser.add_argument("--threshold", type=float, default=None, help="score counted as correct for accuracy")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="on resume, also retry clips that failed to decode or score (not only unreadable files)")
+    args = parser.parse_args(argv)
+
+    run(args.source, args.output, model_path=args.model, workers=args.workers,
+        chunk_size=args.chunk_size, threshold=args.threshold, retry_failed=args.retry_failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
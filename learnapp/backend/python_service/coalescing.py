@@ -0,0 +1,69 @@
+# backend/python-service/coalescing.py
+
+import asyncio
+import hashlib
+
+import metrics
+
+
+def upload_key(data: bytes, target_word: str):
+    """Coalescing key for an analysis: digest of the uploaded bytes plus the target word."""
+    return hashlib.blake2b(data, digest_size=16).digest(), target_word
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical async computations into one.
+
+    The first caller for a key starts the computation; callers arriving with the
+    same key while it is still running await that same result instead of
+    starting their own. Nothing is cached: once the computation finishes, the
+    next caller starts a fresh one. Counts go to the "<name>_executed" and
+    "<name>_coalesced" metrics counters.
+
+    Runs on a single event loop, so no locking is needed.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}
+
+    def in_flight(self):
+        """Number of distinct computations currently running."""
+        return len(self._flights)
+
+    async def do(self, key, function, *args, ticket=None):
+        """
+        Return function(*args) (a coroutine function), shared with concurrent callers of the same key.
+
+        With an admission ticket, the computation is called with ticket= a shared
+        copy that every joining caller widens (latest deadline, highest-priority
+        lane), and each caller waits only until its own deadline.
+        """
+        entry = self._flights.get(key)
+        if entry is not None:
+            metrics.increment(f"{self.name}_coalesced")
+            flight, shared = entry
+            if ticket is not None and shared is not None:
+                shared.merge(ticket)
+        else:
+            metrics.increment(f"{self.name}_executed")
+            if ticket is None:
+                shared = None
+                flight = asyncio.ensure_future(function(*args))
+            else:
+                shared = ticket.copy()
+                flight = asyncio.ensure_future(function(*args, ticket=shared))
+            self._flights[key] = flight, shared
+            flight.add_done_callback(lambda done: self._finish(key, done))
+        # Shielded: one caller disconnecting or timing out must not cancel the work the others wait on
+        if ticket is not None:
+            return await ticket.wait(asyncio.shield(flight))
+        return await asyncio.shield(flight)
+
+    def _finish(self, key, flight):
+        entry = self._flights.get(key)
+        if entry is not None and entry[0] is flight:
+            del self._flights[key]
+        # Mark the exception as seen even if every caller went away before it was raised
+        if not flight.cancelled():
+            flight.exception()
@@ -4,12 +4,59 @@ from scipy import spatial
 import speech_recognition as sr
 import tempfile
 import os
+import bisect
+from phonetic import PhoneticMatcher
+from features import extract_features
+from config import RECOGNITION_SETTINGS
+
+COLOR_NAMES = ["red", "blue", "green", "yellow", "orange", "purple", "pink", "brown"]
+
+# Pronunciation tip per color, built once at import
+COLOR_FEEDBACK = {
+    "red": "Make the 'r' sound strong at the beginning",
+    "blue": "Emphasize the 'bl' blend clearly",
+    "green": "Clear 'gr' sound and long 'ee' vowel",
+    "yellow": "Focus on the 'yell' part, not too fast",
+    "orange": "Two syllables: 'or' and 'ange'",
+    "purple": "Don't forget the 'r' in the middle",
+    "pink": "Clear 'p' sound at the beginning",
+    "brown": "Strong 'br' blend, round 'ow' sound"
+}
+COLOR_INDEX = {color: i for i, color in enumerate(COLOR_NAMES)}
+# Same tips indexed by color id, for batches; the extra last slot (None) is "not a known color"
+COLOR_FEEDBACK_TABLE = np.array([COLOR_FEEDBACK[color] for color in COLOR_NAMES] + [None], dtype=object)
+
+# Rule thresholds and penalties, shared by the per-clip and the batch scorer
+MIN_DURATION = 0.3            # seconds
+MAX_DURATION = 2.0
+MIN_ENERGY = 0.001
+MIN_ZERO_CROSSING = 0.05
+WRONG_WORD_PENALTY = 40
+UNRECOGNIZED_PENALTY = 30
+SHORT_PENALTY = 15
+LONG_PENALTY = 10
+QUIET_PENALTY = 10
+UNVOICED_PENALTY = 8
+COLOR_TIP_PENALTY = 5
+
+# Rating by score band: below 50, 50-69, 70-84, 85 and up
+RATING_BANDS = [50, 70, 85]
+RATINGS = ["Keep practicing! 📚", "Okay! 💪", "Good! 👍", "Excellent! 🌟"]
+RATING_TABLE = np.array(RATINGS, dtype=object)
+
+
+def rate_score(score):
+    """Rating text for a 0-100 score."""
+    return RATINGS[bisect.bisect_right(RATING_BANDS, score)]
+
 
 class ColorsPronunciationAnalyzer:
     def __init__(self):
         self.sample_rate = 16000
-        self.color_names = ["red", "blue", "green", "yellow", "orange", "purple", "pink", "brown"]
+        self.color_names = list(COLOR_NAMES)
         self.recognizer = sr.Recognizer()
+        # Phonetic index over the color names, for telling learners which color a wrong word sounded like
+        self.matcher = PhoneticMatcher(self.color_names, threshold=RECOGNITION_SETTINGS["similarity_threshold"])
         
     def extract_pronunciation_features(self, audio_data):
         """Extract features specifically for color name pronunciation"""
@@ -23,19 +70,8 @@ class ColorsPronunciationAnalyzer:
             # Normalize audio
             audio_float = audio_array.astype(np.float32) / 32768.0
             
-            # Extract features relevant for color names
-            mfccs = librosa.feature.mfcc(y=audio_float, sr=self.sample_rate, n_mfcc=13)
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_float, sr=self.sample_rate)
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio_float)
-            
-            return {
-                'mfcc_mean': np.mean(mfccs, axis=1),
-                'mfcc_std': np.std(mfccs, axis=1),
-                'spectral_centroid_mean': np.mean(spectral_centroid),
-                'zero_crossing_mean': np.mean(zero_crossing_rate),
-                'duration': len(audio_float) / self.sample_rate,
-                'energy': np.mean(audio_float ** 2)
-            }
+            # Extract features relevant for color names (float32 FEATURE_DTYPE record)
+            return extract_features(audio_float, self.sample_rate)
             
         except Exception as e:
             print(f"Error extracting features: {e}")
@@ -62,7 +98,7 @@ class ColorsPronunciationAnalyzer:
         # Extract audio features
         audio_features = self.extract_pronunciation_features_from_file(audio_path)
         
-        if not audio_features:
+        if audio_features is None:
             return {
                 "score": 0, 
                 "rating": "Error", 
@@ -76,46 +112,51 @@ class ColorsPronunciationAnalyzer:
         
         # CRITICAL: Check if the correct word was said
         is_correct_word = False
+        near_misses = []
         if recognized_text:
-            # Check if the recognized text contains the target color
+            # Check if the recognized text contains the target color. Sound-alikes
+            # ("rod", "grain") are real, different words, so they do not count.
             if target_color.lower() in recognized_text.lower():
                 is_correct_word = True
                 feedback.append("✅ Correct word recognized!")
             else:
                 is_correct_word = False
-                score -= 40  # Heavy penalty for wrong word
+                score -= WRONG_WORD_PENALTY  # Heavy penalty for wrong word
                 feedback.append(f"❌ You said '{recognized_text}', but should be '{target_color}'")
+                # The colors the attempt sounded like, nearest first
+                heard_word, _ = self.best_matching_word(target_color, recognized_text)
+                near_misses = [word for word, _ in self.matcher.candidates(heard_word, limit=3)]
         else:
             # If speech recognition failed, we can't verify the word
             is_correct_word = False
-            score -= 30
+            score -= UNRECOGNIZED_PENALTY
             feedback.append("❓ Could not understand what you said")
         
         # Only check pronunciation quality if the correct word was said
         if is_correct_word:
             # Duration check
-            if audio_features['duration'] < 0.3:
-                score -= 15
+            if audio_features['duration'] < MIN_DURATION:
+                score -= SHORT_PENALTY
                 feedback.append("🗣️ Speak a bit longer")
-            elif audio_features['duration'] > 2.0:
-                score -= 10
+            elif audio_features['duration'] > MAX_DURATION:
+                score -= LONG_PENALTY
                 feedback.append("🗣️ Try saying it quicker")
             
             # Energy check (volume)
-            if audio_features['energy'] < 0.001:
-                score -= 10
+            if audio_features['energy'] < MIN_ENERGY:
+                score -= QUIET_PENALTY
                 feedback.append("🔊 Speak louder")
             
             # Zero crossing rate (indicates voicing)
-            if audio_features['zero_crossing_mean'] < 0.05:
-                score -= 8
+            if audio_features['zero_crossing_mean'] < MIN_ZERO_CROSSING:
+                score -= UNVOICED_PENALTY
                 feedback.append("🎤 Make sure to voice the word clearly")
             
             # Color-specific pronunciation guidance
             color_feedback = self.get_color_specific_feedback(target_color, audio_features)
             if color_feedback:
                 feedback.append(color_feedback)
-                score -= 5
+                score -= COLOR_TIP_PENALTY
         else:
             # If wrong word, focus feedback on that
             feedback.append("🎯 Focus on saying the correct color name")
@@ -124,14 +165,7 @@ class ColorsPronunciationAnalyzer:
         score = max(0, min(100, score))
         
         # Determine rating
-        if score >= 85:
-            rating = "Excellent! 🌟"
-        elif score >= 70:
-            rating = "Good! 👍"
-        elif score >= 50:
-            rating = "Okay! 💪"
-        else:
-            rating = "Keep practicing! 📚"
+        rating = rate_score(score)
         
         return {
             "score": round(score),
@@ -139,31 +173,90 @@ class ColorsPronunciationAnalyzer:
             "feedback": feedback,
             "recognized_word": recognized_text or "Unknown",
             "is_correct_word": is_correct_word,
+            "near_misses": near_misses,
             "target_word": target_color,
-            "duration": round(audio_features['duration'], 2),
-            "energy": round(audio_features['energy'], 4)
+            "duration": round(float(audio_features['duration']), 2),
+            "energy": round(float(audio_features['energy']), 4)
         }
     
+    def score_batch(self, target_colors, features, correct_word, recognized=None):
+        """
+        Apply the same rules as analyze_color_pronunciation to many clips at once.
+
+        Each threshold becomes one NumPy mask over the whole batch and the color
+        tips come from COLOR_FEEDBACK_TABLE, so grading a classroom's recordings
+        is a handful of array operations rather than a Python loop per clip.
+
+        Args:
+            target_colors: The n color names the clips should say.
+            features: A FEATURE_DTYPE batch of n records (or any mapping of
+                n-length "duration", "energy" and "zero_crossing_mean" arrays).
+            correct_word: n booleans, True where the target color was recognised.
+            recognized: n booleans, False where speech recognition understood
+                nothing (defaults to all True).
+
+        Returns:
+            A dict of n-length arrays: "score" (0-100), "rating", "color_feedback"
+            (None where the per-clip path gives no tip: wrong or unrecognised
+            word, unknown color) and the masks "too_short", "too_long",
+            "too_quiet" and "unvoiced" for building per-clip messages.
+        """
+        correct = np.asarray(correct_word, dtype=bool)
+        n = correct.shape[0]
+        recognized = np.ones(n, dtype=bool) if recognized is None else np.asarray(recognized, dtype=bool)
+        duration = np.asarray(features["duration"])
+        energy = np.asarray(features["energy"])
+        zero_crossing = np.asarray(features["zero_crossing_mean"])
+
+        # Quality rules only apply where the correct word was said
+        too_short = correct & (duration < MIN_DURATION)
+        too_long = correct & (duration > MAX_DURATION)
+        too_quiet = correct & (energy < MIN_ENERGY)
+        unvoiced = correct & (zero_crossing < MIN_ZERO_CROSSING)
+
+        color_ids = self._color_ids(target_colors)
+        has_tip = correct & (color_ids < len(COLOR_NAMES))
+
+        score = np.full(n, 100, dtype=np.int32)
+        score -= np.where(correct, 0, np.where(recognized, WRONG_WORD_PENALTY, UNRECOGNIZED_PENALTY)).astype(np.int32)
+        score -= (SHORT_PENALTY * too_short + LONG_PENALTY * too_long + QUIET_PENALTY * too_quiet
+                  + UNVOICED_PENALTY * unvoiced + COLOR_TIP_PENALTY * has_tip).astype(np.int32)
+        np.clip(score, 0, 100, out=score)
+
+        return {
+            "score": score,
+            "rating": RATING_TABLE[np.searchsorted(RATING_BANDS, score, side="right")],
+            # Tips only where the per-clip path gives one (correct word, known color)
+            "color_feedback": np.where(has_tip, COLOR_FEEDBACK_TABLE[color_ids], None),
+            "too_short": too_short,
+            "too_long": too_long,
+            "too_quiet": too_quiet,
+            "unvoiced": unvoiced
+        }
+
+    def _color_ids(self, target_colors):
+        """Index of each target color in COLOR_NAMES (len(COLOR_NAMES) if unknown)."""
+        names, inverse = np.unique(np.asarray(target_colors, dtype=str), return_inverse=True)
+        ids = np.array([COLOR_INDEX.get(name.lower(), len(COLOR_NAMES)) for name in names], dtype=np.intp)
+        return ids[inverse.reshape(-1)]
+
+    def best_matching_word(self, target_color, recognized_text):
+        """Return the recognized word that sounds most like the target, with its similarity"""
+        best_word, best_similarity = recognized_text, 0.0
+        for word in recognized_text.lower().split():
+            similarity = self.matcher.similarity(word, target_color)
+            if similarity > best_similarity:
+                best_word, best_similarity = word, similarity
+        return best_word, best_similarity
+    
     def extract_pronunciation_features_from_file(self, audio_path):
         """Extract features from audio file"""
         try:
             # Load audio file
             audio_data, sr = librosa.load(audio_path, sr=self.sample_rate)
-            audio_float = audio_data.astype(np.float32)
             
             # Extract features
-            mfccs = librosa.feature.mfcc(y=audio_float, sr=sr, n_mfcc=13)
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_float, sr=sr)
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio_float)
-            
-            return {
-                'mfcc_mean': np.mean(mfccs, axis=1),
-                'mfcc_std': np.std(mfccs, axis=1),
-                'spectral_centroid_mean': np.mean(spectral_centroid),
-                'zero_crossing_mean': np.mean(zero_crossing_rate),
-                'duration': len(audio_float) / sr,
-                'energy': np.mean(audio_float ** 2)
-            }
+            return extract_features(audio_data, sr)
             
         except Exception as e:
             print(f"Error extracting features from file: {e}")
@@ -171,17 +264,7 @@ class ColorsPronunciationAnalyzer:
     
     def get_color_specific_feedback(self, color_name, features):
         """Provide specific feedback for each color"""
-        feedback_map = {
-            "red": "Make the 'r' sound strong at the beginning",
-            "blue": "Emphasize the 'bl' blend clearly",
-            "green": "Clear 'gr' sound and long 'ee' vowel",
-            "yellow": "Focus on the 'yell' part, not too fast",
-            "orange": "Two syllables: 'or' and 'ange'",
-            "purple": "Don't forget the 'r' in the middle",
-            "pink": "Clear 'p' sound at the beginning",
-            "brown": "Strong 'br' blend, round 'ow' sound"
-        }
-        return feedback_map.get(color_name.lower())
+        return COLOR_FEEDBACK.get(color_name.lower())
 
 # Flask API endpoint example (add this to your main app)
 """
@@ -1,10 +1,13 @@
 # Configuration settings for the Pronunciation Assistant
 
-# Word database configuration (Moved to JSON later, but kept here for configuration reference)
-WORD_DATABASE_CONFIG = [
-    {"word": "hello", "phonetic": "həˈloʊ", "difficulty": "easy"},
-    # ... placeholder for the full list if used internally
-]
+import os
+
+# Word lexicon: one TSV (word, IPA, difficulty, category, variants) shared with the
+# CLI tutor, compiled on first use into an indexed SQLite file (see lexicon.py)
+LEXICON_SETTINGS = {
+    "source_path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lexicon.tsv"),
+    "index_path": None  # defaults to data/lexicon.db next to the source
+}
 
 # Audio settings
 AUDIO_SETTINGS = {
@@ -20,6 +23,89 @@ RECOGNITION_SETTINGS = {
     "similarity_threshold": 0.7
 }
 
+# Attempt log settings (SQLite in WAL mode, written in batches by a background thread)
+ATTEMPT_STORE_SETTINGS = {
+    "db_path": "attempts.db",
+    "batch_size": 256,       # max attempts committed per transaction
+    "flush_interval": 0.05   # seconds to wait for more attempts before committing
+}
+
+# Progress endpoints (/users/{user_id}/...): requested row limits are clamped to 1..max_limit
+PROGRESS_SETTINGS = {
+    "max_limit": 500
+}
+
+# Spaced-repetition scheduler settings
+SCHEDULER_SETTINGS = {
+    "max_cached_learners": 1000  # per-user schedules kept in memory (rebuilt from the attempt log on a miss)
+}
+
+# Production server settings (gunicorn_conf.py); WEB_CONCURRENCY overrides "workers"
+SERVER_SETTINGS = {
+    "host": "0.0.0.0",
+    "port": 8000,
+    "workers": os.cpu_count() or 1,
+    "timeout": 120,          # seconds before a silent worker is killed and replaced
+    "graceful_timeout": 30   # seconds workers get to finish in-flight requests on restart
+}
+
+# Decode stage: compressed uploads (m4a/mp3) are decoded by this many long-lived
+# processes per server worker; None = never recycle a decoder process
+DECODER_SETTINGS = {
+    "workers": 2,
+    "max_tasks_per_worker": None
+}
+
+# Admission control for /analyze/ (per server worker)
+ADMISSION_SETTINGS = {
+    "max_concurrent": 2,                             # analyses decoding/scoring at once
+    "max_queued": {"interactive": 32, "batch": 8},   # waiting requests per lane before 503s
+    "default_timeout": 30.0,                         # seconds, when the client sends no X-Request-Timeout-Ms
+    "max_timeout": 120.0,                            # longer client timeouts are clamped to this
+    "short_clip_bytes": 512 * 1024                   # larger uploads go to the batch lane
+}
+
+# Memory guardrails per server worker (memory_guard.py). PRONUNCIATION_RECYCLE=0
+# turns worker recycling off, for soak runs (soak_test.py) that must see the drift
+_RECYCLE_WORKERS = os.environ.get("PRONUNCIATION_RECYCLE", "1") != "0"
+MEMORY_SETTINGS = {
+    "sample_interval": 10.0,     # seconds between RSS samples
+    "history": 360,              # samples kept for /debug/memory (an hour at 10 s)
+    # tracemalloc slows allocation down noticeably, so it is off unless asked for
+    "tracemalloc": os.environ.get("PRONUNCIATION_TRACEMALLOC") == "1",
+    "tracemalloc_frames": 1,
+    "max_requests": 5000 if _RECYCLE_WORKERS else 0,  # gunicorn replaces a worker after this many requests (0 = never)
+    "max_requests_jitter": 500,  # spread so workers are not all replaced at once
+    "max_growth_mb": 300 if _RECYCLE_WORKERS else None  # replace a worker whose RSS grew this much since warm-up (None = never)
+}
+
+# Soak test (soak_test.py): long synthetic load against a running server
+SOAK_SETTINGS = {
+    "duration": 3 * 3600,        # seconds
+    "concurrency": 4,            # clients sending requests back to back
+    "window": 300,               # seconds per measurement window
+    "clip_durations": [0.5, 1.0, 2.0],
+    "max_rss_growth_mb": 50,     # fail if worker memory grows more than this from the first window
+    "max_p99_growth": 0.5,       # fail if p99 latency grows more than 50% from the first window
+    "request_timeout": 30
+}
+
+# Offline batch scoring (batch_score.py)
+BATCH_SETTINGS = {
+    "workers": os.cpu_count() or 1,  # decode + feature extraction processes
+    "chunk_size": 512,               # files per chunk; at most two chunks are in memory at once
+    "threshold": 0.5                 # score at or above which a clip counts as "correct" for accuracy
+}
+
+# Warm-up settings: synthetic clips pushed through the full analysis path before serving
+WARMUP_SETTINGS = {
+    "clip_durations": [0.5, 1.0, 2.0, 4.0],   # seconds, typical single-word recordings
+    "source_sample_rates": [16000, 44100],    # 44.1 kHz exercises the resampler
+    "max_rounds": 5,
+    "tolerance": 0.2,                         # stop once a round is within 20% of the previous one
+    "numba_cache_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), ".numba_cache")
+}
+
 # UI settings (can be read by the client via API later)
 UI_SETTINGS = {
     "show_phonetic": True,
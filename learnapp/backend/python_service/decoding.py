@@ -0,0 +1,319 @@
+# backend/python-service/decoding.py
+
+import asyncio
+import io
+import os
+import queue
+import select
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+import metrics
+from admission import DeadlineExceeded
+
+# Everything is decoded to what the feature extractor expects
+TARGET_SAMPLE_RATE = 16000
+
+# Uploads soundfile (libsndfile) decodes directly in the request; everything
+# else (m4a/aac, mp3 on older libsndfile, ...) goes to the decoder processes
+PCM_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/flac", "audio/ogg"}
+
+
+class DecodeError(Exception):
+    """Raised when an upload cannot be decoded to PCM."""
+
+
+def _to_target_rate(samples, sample_rate):
+    """Downmix to mono and resample to TARGET_SAMPLE_RATE (same steps as librosa.load)."""
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    samples = np.ascontiguousarray(samples, dtype=np.float32)
+    if sample_rate != TARGET_SAMPLE_RATE:
+        import librosa
+        samples = librosa.resample(samples, orig_sr=sample_rate, target_sr=TARGET_SAMPLE_RATE)
+    return samples.astype(np.float32, copy=False)
+
+
+def decode_pcm(data: bytes):
+    """Decode WAV/FLAC/OGG bytes in-process with libsndfile."""
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=False)
+    return _to_target_rate(samples, sample_rate)
+
+
+def decode_compressed(data: bytes):
+    """
+    Decode compressed audio (m4a/aac/mp3) to 16 kHz mono float32.
+
+    Runs inside a decoder process. Uses PyAV (libavcodec linked in-process, with
+    its resampler doing the downmix and rate conversion) when it is installed;
+    otherwise falls back to librosa.load on a temporary file, the slow path.
+    """
+    try:
+        import av
+    except ImportError:
+        av = None
+
+    if av is not None:
+        chunks = []
+        with av.open(io.BytesIO(data), mode="r") as container:
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format="flt", layout="mono", rate=TARGET_SAMPLE_RATE)
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            # Flush samples still buffered in the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks).astype(np.float32, copy=False)
+
+    import librosa
+    with tempfile.NamedTemporaryFile(suffix=".audio", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        samples, _ = librosa.load(tmp.name, sr=TARGET_SAMPLE_RATE, mono=True)
+        return samples.astype(np.float32, copy=False)
+    finally:
+        os.remove(tmp.name)
+
+
+def _warm_decoder():
+    """Import the codec libraries once per decoder process, not per file."""
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        import librosa  # noqa: F401
+
+
+# --- Decoder processes ---
+# Each decoder is this file run as a script (`python decoding.py`), talking to
+# the server over its stdin/stdout pipes. Starting it with a plain exec rather
+# than multiprocessing means it never re-imports the server's __main__ (which
+# would load the app, model, lexicon and attempt store in every decoder).
+#
+#   request:  <u32 length><upload bytes>          (length 0 = ping)
+#   response: <u8 status><u32 length><payload>    (status 0: float32 samples,
+#                                                  status 1: UTF-8 error message)
+
+_HEADER = struct.Struct("<I")
+_RESPONSE_HEADER = struct.Struct("<BI")
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("decoder pipe closed")
+    return data
+
+
+def _read_exact_until(fd, size, deadline=None):
+    """Read size bytes from a pipe fd, raising TimeoutError if deadline (time.monotonic()) passes first."""
+    data = bytearray()
+    while len(data) < size:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("decoder did not answer before the deadline")
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            raise EOFError("decoder pipe closed")
+        data += chunk
+    return bytes(data)
+
+
+def serve(requests, responses):
+    """Decoder process main loop: answer requests until the server closes the pipe."""
+    _warm_decoder()
+    while True:
+        try:
+            (size,) = _HEADER.unpack(_read_exact(requests, _HEADER.size))
+        except EOFError:
+            return
+        data = _read_exact(requests, size)
+        if not data:
+            status, payload = 0, b""
+        else:
+            try:
+                status, payload = 0, decode_compressed(data).astype("<f4", copy=False).tobytes()
+            except Exception as e:
+                status, payload = 1, f"{type(e).__name__}: {e}".encode("utf-8", "replace")
+        responses.write(_RESPONSE_HEADER.pack(status, len(payload)))
+        responses.write(payload)
+        responses.flush()
+
+
+class _DecoderProcess:
+    """One long-lived decoder process and its pipes (used by one thread at a time)."""
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, close_fds=True
+        )
+        self.tasks = 0
+
+    def request(self, data: bytes, deadline: float = None):
+        """
+        Send one upload and wait for the result until deadline (time.monotonic()).
+        Raises EOFError/OSError if the process died and TimeoutError if it did not
+        answer in time; either way the process must not be reused.
+        """
+        self.process.stdin.write(_HEADER.pack(len(data)))
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+        # Read the raw fd (never the buffered stdout object) so select() sees all pending bytes
+        fd = self.process.stdout.fileno()
+        status, size = _RESPONSE_HEADER.unpack(_read_exact_until(fd, _RESPONSE_HEADER.size, deadline))
+        payload = _read_exact_until(fd, size, deadline)
+        self.tasks += 1
+        if status:
+            raise DecodeError(payload.decode("utf-8", "replace"))
+        return np.frombuffer(payload, dtype="<f4").astype(np.float32, copy=False)
+
+    def kill(self):
+        self.process.kill()
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+class AudioDecoder:
+    """
+    Decode stage in front of feature extraction.
+
+    PCM formats are decoded in the request thread. Compressed uploads are sent
+    through pipes to a set of long-lived decoder processes, which are reused for
+    every request instead of a decoder backend being started per file. Decode
+    time is recorded in the "decode_pcm" and "decode_compressed" timers.
+    """
+    def __init__(self, workers: int = 2, max_tasks_per_worker: int = None):
+        self.workers = workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._idle = None
+        self._processes = []
+        self._pid = None
+        self._warm_pid = None
+        self._lock = threading.Lock()
+
+    def _get_idle(self):
+        """Queue of idle decoder processes for this server process (started on first use, and again after a fork)."""
+        if self._pid == os.getpid():
+            return self._idle
+        with self._lock:
+            if self._pid != os.getpid():
+                # Processes (and pipes) inherited from a parent belong to the parent
+                self._processes = [_DecoderProcess() for _ in range(self.workers)]
+                self._idle = queue.Queue()
+                for process in self._processes:
+                    self._idle.put(process)
+                self._pid = os.getpid()
+        return self._idle
+
+    def _replace(self, process):
+        process.close()
+        replacement = _DecoderProcess()
+        with self._lock:
+            self._processes = [replacement if p is process else p for p in self._processes]
+        return replacement
+
+    def _decode_in_process(self, data: bytes, deadline: float = None):
+        """Run one upload through an idle decoder process (blocks until one is free, or until deadline)."""
+        idle = self._get_idle()
+        try:
+            process = idle.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            raise DeadlineExceeded("Request deadline passed while waiting for a decoder") from None
+        try:
+            return process.request(data, deadline)
+        except TimeoutError:
+            # Possibly stuck on a malformed file: never hand it another upload
+            metrics.increment("decode_timeouts")
+            process.kill()
+            process = self._replace(process)
+            raise DeadlineExceeded("Request deadline passed while the audio was decoding") from None
+        except (EOFError, OSError) as e:
+            # The process died (e.g. a codec crash): start a fresh one for the next upload
+            process = self._replace(process)
+            raise DecodeError(f"decoder process failed: {e}") from e
+        finally:
+            if self.max_tasks_per_worker and process.tasks >= self.max_tasks_per_worker:
+                process = self._replace(process)
+            idle.put(process)
+
+    @staticmethod
+    def is_pcm(content_type: str):
+        return content_type in PCM_CONTENT_TYPES
+
+    def decode(self, data: bytes, content_type: str, deadline: float = None):
+        """
+        Decode an upload to 16 kHz mono float32 samples (blocking). A compressed
+        upload not decoded by deadline (time.monotonic()) raises DeadlineExceeded.
+        """
+        started = time.perf_counter()
+        try:
+            if self.is_pcm(content_type):
+                samples = decode_pcm(data)
+                metrics.observe("decode_pcm", time.perf_counter() - started)
+            else:
+                samples = self._decode_in_process(data, deadline)
+                metrics.observe("decode_compressed", time.perf_counter() - started)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            metrics.increment("decode_errors")
+            raise DecodeError(str(e)) from e
+        return samples
+
+    async def decode_async(self, data: bytes, content_type: str, deadline: float = None):
+        """Decode without blocking the event loop (a thread waits on the decoder pipe for compressed uploads)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.decode, data, content_type, deadline)
+
+    def warm_up(self):
+        """
+        Start the decoder processes now, and wait until each has loaded its codecs.
+        Afterwards is_warm() is true in this process, also if a ping failed (the
+        process is replaced on first use), so a broken codec cannot keep the
+        server out of rotation.
+        """
+        idle = self._get_idle()
+        ready = [idle.get() for _ in range(self.workers)]
+        try:
+            for process in ready:
+                process.request(b"")
+        except Exception as e:
+            print(f"ERROR: Decoder warm-up failed, decoding cold: {e}")
+        finally:
+            for process in ready:
+                idle.put(process)
+            self._warm_pid = os.getpid()
+
+    def is_warm(self):
+        """True once warm_up() has finished in this process (not inherited across a fork)."""
+        return self._warm_pid == os.getpid()
+
+    def shutdown(self):
+        if self._pid == os.getpid():
+            with self._lock:
+                for process in self._processes:
+                    process.close()
+                self._processes = []
+                self._pid = None
+
+
+if __name__ == "__main__":
+    # Decoder process: keep the pipe clean by sending anything printed to stderr
+    responses = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    serve(sys.stdin.buffer, responses)
@@ -0,0 +1,109 @@
+# backend/python-service/features.py
+
+import json
+import numpy as np
+import librosa
+
+N_MFCC = 13
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+
+# Fixed float32 layout for one clip's features. A batch is simply an array of
+# these records: batch["mfcc_mean"] is an (n, 13) float32 view that can go to the
+# model without copying, and a single record still supports record["duration"].
+FEATURE_DTYPE = np.dtype([
+    ("mfcc_mean", np.float32, (N_MFCC,)),
+    ("mfcc_std", np.float32, (N_MFCC,)),
+    ("spectral_centroid", np.float32),
+    ("spectral_rolloff", np.float32),
+    ("zero_crossing_mean", np.float32),
+    ("energy", np.float32),
+    ("duration", np.float32),
+], align=True)
+
+# Mel filterbanks by sample rate, built once instead of on every request
+_MEL_BASES = {}
+
+
+def _mel_basis(sample_rate):
+    basis = _MEL_BASES.get(sample_rate)
+    if basis is None:
+        basis = librosa.filters.mel(sr=sample_rate, n_fft=N_FFT, n_mels=N_MELS)
+        _MEL_BASES[sample_rate] = basis
+    return basis
+
+
+def empty_feature_batch(n: int):
+    """A zeroed batch of n feature records, to be filled in place by extract_features."""
+    return np.zeros(n, dtype=FEATURE_DTYPE)
+
+
+def extract_features(audio: np.ndarray, sample_rate: int, out=None):
+    """
+    Compute every feature the analyzers use from a float audio signal.
+
+    One magnitude STFT feeds the MFCCs (through the cached mel basis), the
+    spectral centroid and the rolloff, instead of librosa recomputing it per
+    feature. Values match librosa's defaults (n_fft=2048, hop=512, 128 mels).
+
+    Args:
+        audio (np.ndarray): Mono audio, already at `sample_rate`.
+        sample_rate (int): Sample rate of `audio`.
+        out: Optional record to fill in place, e.g. batch[i] of empty_feature_batch().
+
+    Returns:
+        The filled FEATURE_DTYPE record.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    record = out if out is not None else empty_feature_batch(1)[0]
+
+    magnitude = np.abs(librosa.stft(audio, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    record["spectral_centroid"] = librosa.feature.spectral_centroid(S=magnitude, sr=sample_rate, n_fft=N_FFT).mean()
+    record["spectral_rolloff"] = librosa.feature.spectral_rolloff(S=magnitude, sr=sample_rate, n_fft=N_FFT).mean()
+
+    # The magnitude is not needed after this, so square it in place rather than
+    # allocating a second spectrogram-sized array for the power
+    power = np.square(magnitude, out=magnitude)
+    mfccs = librosa.feature.mfcc(S=librosa.power_to_db(_mel_basis(sample_rate) @ power), n_mfcc=N_MFCC)
+    del magnitude, power
+
+    record["mfcc_mean"] = mfccs.mean(axis=1)
+    record["mfcc_std"] = mfccs.std(axis=1)
+    record["zero_crossing_mean"] = librosa.feature.zero_crossing_rate(audio, frame_length=N_FFT, hop_length=HOP_LENGTH).mean()
+    record["energy"] = np.mean(audio ** 2)
+    record["duration"] = len(audio) / sample_rate
+    return record
+
+
+class AnalysisResult:
+    """
+    Result of one pronunciation analysis, as returned by analyze_pronunciation_for_api.
+
+    Uses __slots__ (no per-instance dict) and serialises straight to the JSON
+    body the mobile app expects.
+    """
+    __slots__ = ("score", "feedback", "target_word", "features_digest")
+
+    def __init__(self, score, feedback: str, target_word: str, features_digest: str = None):
+        self.score = float(score)
+        self.feedback = feedback
+        self.target_word = target_word
+        self.features_digest = features_digest
+
+    def to_dict(self):
+        result = {
+            "score": round(self.score, 2),
+            "feedback": self.feedback,
+            "target_word": self.target_word
+        }
+        if self.features_digest is not None:
+            result["features_digest"] = self.features_digest
+        return result
+
+    def to_json(self):
+        """UTF-8 JSON body for the HTTP response."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def __repr__(self):
+        return f"AnalysisResult({self.to_dict()!r})"
@@ -0,0 +1,65 @@
+# backend/python-service/gunicorn_conf.py
+#
+# Production server: the master process imports the app (loading the model),
+# warms up librosa and the model, and only then forks the workers, so the
+# model, imported libraries and warmed caches are shared copy-on-write instead
+# of being loaded again by every worker.
+#
+#   gunicorn -c gunicorn_conf.py app:app
+#
+# Graceful restarts: `kill -HUP <master pid>` replaces the workers, letting
+# in-flight requests finish (new workers are forked from the already warm master).
+# To deploy a new model or code, send USR2 to start a fresh master, then WINCH
+# and QUIT to the old one.
+
+import os
+import time
+
+import memory_guard
+import worker_stats
+from config import SERVER_SETTINGS, MEMORY_SETTINGS
+
+bind = f"{SERVER_SETTINGS['host']}:{SERVER_SETTINGS['port']}"
+workers = int(os.environ.get("WEB_CONCURRENCY", SERVER_SETTINGS["workers"]))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = SERVER_SETTINGS["graceful_timeout"]
+timeout = SERVER_SETTINGS["timeout"]
+accesslog = "-"
+
+# Worker recycling: after max_requests (gunicorn), or when a worker's RSS has
+# grown by MEMORY_SETTINGS["max_growth_mb"] (memory_guard); either way the
+# replacement is forked from the warm master
+max_requests = MEMORY_SETTINGS["max_requests"]
+max_requests_jitter = MEMORY_SETTINGS["max_requests_jitter"]
+
+
+def on_starting(server):
+    worker_stats.reset_stats_dir()
+
+
+def when_ready(server):
+    # Runs in the master after the app has been preloaded and before any worker is forked
+    import warmup
+    seconds = warmup.warm_up()
+    worker_stats.record_process("master", warmup_seconds=seconds, warmup_rounds_ms=warmup.WARMUP_STATE["round_ms"])
+    server.log.info(f"Warm-up finished in {seconds:.2f}s ({warmup.WARMUP_STATE['status']}), forking {server.num_workers} workers")
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+    memory_guard.enable_recycling()
+
+
+def post_worker_init(worker):
+    boot_seconds = time.perf_counter() - worker.forked_at
+    worker_stats.record_process("worker", boot_seconds=round(boot_seconds, 3))
+    worker.log.info(f"Worker {worker.pid} ready {boot_seconds:.2f}s after fork")
+
+
+def child_exit(server, worker):
+    worker_stats.forget_process(worker.pid)
+
+
+def on_exit(server):
+    worker_stats.forget_process(os.getpid())
@@ -0,0 +1,221 @@
+# backend/python-service/lexicon.py
+
+import csv
+import os
+import sqlite3
+import threading
+
+# The lexicon has a single source of truth: a tab-separated file with the columns
+#   word, phonetic (IPA), difficulty, category, variants ("|"-separated accepted variants)
+# It is compiled on first use into an indexed SQLite file next to it. Queries go
+# through that index (memory-mapped, pages faulted in on demand), so opening a
+# lexicon of hundreds of thousands of words costs neither startup time nor RSS.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_SOURCE_PATH = os.path.join(DATA_DIR, "lexicon.tsv")
+
+VARIANT_SEPARATOR = "|"
+
+INDEX_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    phonetic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE TABLE variants (
+    variant TEXT NOT NULL,
+    entry_id INTEGER NOT NULL
+);
+"""
+
+# Indexes are created after the bulk insert, which is much faster than maintaining them row by row
+INDEX_DEFINITIONS = """
+CREATE UNIQUE INDEX idx_entries_word ON entries (word);
+CREATE INDEX idx_entries_category ON entries (category, id);
+CREATE INDEX idx_entries_difficulty ON entries (difficulty, id);
+CREATE INDEX idx_variants_variant ON variants (variant, entry_id);
+"""
+
+ENTRY_COLUMNS = "word, phonetic, difficulty, category"
+
+
+def build_index(source_path: str, index_path: str):
+    """
+    Compile the TSV lexicon into an indexed SQLite file.
+
+    The index is written to a temporary file and swapped in atomically, so
+    processes already reading the old index are never disturbed.
+    """
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(INDEX_SCHEMA)
+
+        # Ids are assigned densely in file order, so position i is simply id i + 1
+        count = 0
+        with open(source_path, newline="", encoding="utf-8") as source, conn:
+            reader = csv.DictReader(source, delimiter="\t", quoting=csv.QUOTE_NONE)
+            for row in reader:
+                word = row["word"].strip().lower()
+                if not word:
+                    continue
+                count += 1
+                conn.execute(
+                    "INSERT INTO entries (id, word, phonetic, difficulty, category) VALUES (?, ?, ?, ?, ?)",
+                    (count, word, row["phonetic"].strip(), row["difficulty"].strip() or "medium", row["category"].strip())
+                )
+                variants = [v.strip().lower() for v in (row.get("variants") or "").split(VARIANT_SEPARATOR) if v.strip()]
+                conn.executemany(
+                    "INSERT INTO variants (variant, entry_id) VALUES (?, ?)",
+                    [(variant, count) for variant in variants]
+                )
+
+        conn.executescript(INDEX_DEFINITIONS)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, index_path)
+    return count
+
+
+class Lexicon:
+    """
+    Read-only view of the word lexicon, indexed by word, category and difficulty.
+
+    Nothing is read from disk until the first query. Entries are returned as
+    plain dicts (word, phonetic, difficulty, category), and the lexicon also
+    behaves as a sequence in file order so it can be handed to the scheduler.
+    """
+    def __init__(self, source_path: str = DEFAULT_SOURCE_PATH, index_path: str = None, mmap_size: int = 256 * 1024 * 1024):
+        self.source_path = source_path
+        self.index_path = index_path or os.path.splitext(source_path)[0] + ".db"
+        self.mmap_size = mmap_size
+
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        self._ready = False
+        self._length = None
+
+    def _ensure_index(self):
+        """Compile the index if it is missing or older than the TSV source."""
+        if self._ready:
+            return
+        with self._build_lock:
+            if self._ready:
+                return
+            stale = (
+                not os.path.exists(self.index_path)
+                or os.path.getmtime(self.index_path) < os.path.getmtime(self.source_path)
+            )
+            if stale:
+                count = build_index(self.source_path, self.index_path)
+                print(f"Compiled lexicon index with {count} words: {self.index_path}")
+            self._ready = True
+
+    def _conn(self):
+        """Return the calling thread's read-only connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited across fork (e.g. from a preloading server) must not be reused
+        if conn is None or self._local.pid != os.getpid():
+            self._ensure_index()
+            conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _entries(self, sql, params=()):
+        return [dict(row) for row in self._conn().execute(sql, params).fetchall()]
+
+    # --- Sequence protocol (file order) ---
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        row = self._conn().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE id = ?", (index + 1,)
+        ).fetchone()
+        if row is None:
+            raise IndexError("lexicon index out of range")
+        return dict(row)
+
+    def __iter__(self):
+        for row in self._conn().execute(f"SELECT {ENTRY_COLUMNS} FROM entries ORDER BY id"):
+            yield dict(row)
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    # --- Indexed lookups ---
+
+    def get(self, word: str):
+        """The entry for a word, or None if it is not in the lexicon."""
+        row = self._conn().execute(
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE word = ?", (word.lower(),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def words_in_category(self, category: str, difficulty: str = None, limit: int = -1):
+        """Entries in a category, optionally of one difficulty, in file order."""
+        if difficulty is None:
+            return self._entries(
+                f"SELECT {ENTRY_COLUMNS} FROM entries WHERE category = ? ORDER BY id LIMIT ?",
+                (category, limit)
+            )
+        return self._entries(
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE category = ? AND difficulty = ? ORDER BY id LIMIT ?",
+            (category, difficulty, limit)
+        )
+
+    def words_by_difficulty(self, difficulty: str, limit: int = -1):
+        """Entries with the given difficulty ("easy", "medium", "hard"), in file order."""
+        return self._entries(
+            f"SELECT {ENTRY_COLUMNS} FROM entries WHERE difficulty = ? ORDER BY id LIMIT ?",
+            (difficulty, limit)
+        )
+
+    def variants(self, word: str):
+        """Accepted alternative spellings/recognitions for a word."""
+        rows = self._conn().execute(
+            "SELECT v.variant FROM variants v JOIN entries e ON e.id = v.entry_id WHERE e.word = ?",
+            (word.lower(),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def iter_variants(self):
+        """Yield (word, [variants]) for every word that lists accepted variants."""
+        cursor = self._conn().execute(
+            "SELECT e.word, group_concat(v.variant, ?) FROM variants v JOIN entries e ON e.id = v.entry_id "
+            "GROUP BY e.id ORDER BY e.id",
+            (VARIANT_SEPARATOR,)
+        )
+        for word, variants in cursor:
+            yield word, variants.split(VARIANT_SEPARATOR)
+
+    def is_accepted_variant(self, word: str, heard: str):
+        """True if `heard` is a listed acceptable variant of `word`."""
+        row = self._conn().execute(
+            "SELECT 1 FROM variants v JOIN entries e ON e.id = v.entry_id WHERE v.variant = ? AND e.word = ?",
+            (heard.lower(), word.lower())
+        ).fetchone()
+        return row is not None
+
+
+if __name__ == "__main__":
+    # Recompile the index explicitly, e.g. after editing the TSV in a deployment step
+    lexicon = Lexicon()
+    total = build_index(lexicon.source_path, lexicon.index_path)
+    print(f"Lexicon index rebuilt: {total} words -> {lexicon.index_path}")
@@ -1,16 +1,32 @@
 # backend/python-service/main.py
 
 import os
+import hashlib
+from config import WARMUP_SETTINGS
+
+# Keep numba's compiled kernels (used inside librosa) on disk across restarts.
+# This has to be set before librosa is imported for the first time.
+os.environ.setdefault("NUMBA_CACHE_DIR", WARMUP_SETTINGS["numba_cache_dir"])
+
 import librosa
 import numpy as np
 from joblib import load
 
 # Import the feature extraction logic from your adjacent file
 from advanced_analysis import AdvancedPronunciationAnalyzer 
+from features import AnalysisResult
 
 # Global variable to hold the trained model instance
 PRONUNCIATION_MODEL = None 
 
+# The analyzer holds no per-request state, so one instance serves every request
+ANALYZER = AdvancedPronunciationAnalyzer()
+
+# Feedback messages by score band
+FEEDBACK_EXCELLENT = "Excellent pronunciation! Great job."
+FEEDBACK_GOOD = "Good job! A little practice on vowels will make it perfect."
+FEEDBACK_NEEDS_PRACTICE = "Needs practice. Try focusing on the initial sound."
+
 # --- Helper Function for Model Loading ---
 def load_ai_model():
     """Load the trained model from the joblib file."""
@@ -42,35 +58,46 @@ load_ai_model()
 def analyze_pronunciation_for_api(audio_path: str, target_word: str):
     """
     Receives an audio file path, runs the feature extraction and the trained model,
-    and returns a score and feedback.
+    and returns an AnalysisResult (score and feedback).
+    """
+    # 1. Fallback if the AI model is not yet trained/loaded
+    if PRONUNCIATION_MODEL is None:
+        return AnalysisResult(0.10, f"SYSTEM ERROR: AI Model not trained/loaded. Target: {target_word}", target_word)
+
+    try:
+        # Load audio using librosa (handles various formats: wav, m4a, etc.)
+        y, sr = librosa.load(audio_path, sr=16000)
+    except Exception as e:
+        return AnalysisResult(0.0, f"Audio processing failed (librosa): {e}", target_word)
+
+    return analyze_audio_for_api(y, target_word)
+
+
+def analyze_audio_for_api(audio: np.ndarray, target_word: str):
+    """
+    Same as analyze_pronunciation_for_api, for audio that has already been decoded
+    to 16 kHz mono samples (by the decode stage in decoding.py).
     """
     global PRONUNCIATION_MODEL
     
     # 1. Fallback if the AI model is not yet trained/loaded
     if PRONUNCIATION_MODEL is None:
-        return {
-            "score": 0.10,
-            "feedback": f"SYSTEM ERROR: AI Model not trained/loaded. Target: {target_word}",
-            "target_word": target_word
-        }
-
-    # 2. Load Audio and Extract Features
-    analyzer = AdvancedPronunciationAnalyzer()
-    
+        return AnalysisResult(0.10, f"SYSTEM ERROR: AI Model not trained/loaded. Target: {target_word}", target_word)
+
+    # 2. Extract Features
     try:
-        # Load audio using librosa (handles various formats: wav, m4a, etc.)
-        y, sr = librosa.load(audio_path, sr=analyzer.sample_rate)
         # Pass the raw audio array to the feature extractor from advanced_analysis.py
-        features = analyzer.extract_audio_features(y)
+        features = ANALYZER.extract_audio_features(audio)
     except Exception as e:
-        return {"score": 0.0, "feedback": f"Audio processing failed (librosa): {e}", "target_word": target_word}
+        return AnalysisResult(0.0, f"Audio processing failed (librosa): {e}", target_word)
 
-    if features is None or 'mfcc_mean' not in features:
-        return {"score": 0.0, "feedback": "Could not extract MFCC features from audio.", "target_word": target_word}
+    if features is None:
+        return AnalysisResult(0.0, "Could not extract MFCC features from audio.", target_word)
 
     # 3. Format Features for the Model
     # Our trained model expects a single feature vector (1x13, representing 13 mean MFCCs)
-    # The reshape is crucial for scikit-learn models.
+    # The reshape is crucial for scikit-learn models. The record's float32 layout is
+    # what the tree ensemble uses internally, so no conversion copy is made.
     feature_vector = features['mfcc_mean'].reshape(1, -1)
     
     # 4. Get Prediction and Probability (Score)
@@ -79,17 +106,16 @@ def analyze_pronunciation_for_api(audio_path: str, target_word: str):
     probability = PRONUNCIATION_MODEL.predict_proba(feature_vector)[0][1] 
 
     score = round(float(probability), 2)
+
+    # Short fingerprint of the exact features that were scored (stored with each attempt)
+    features_digest = hashlib.sha1(feature_vector.tobytes()).hexdigest()
     
     # 5. Generate Feedback based on the score
     if score >= 0.90:
-        feedback = "Excellent pronunciation! Great job."
+        feedback = FEEDBACK_EXCELLENT
     elif score >= 0.70:
-        feedback = "Good job! A little practice on vowels will make it perfect."
+        feedback = FEEDBACK_GOOD
     else:
-        feedback = "Needs practice. Try focusing on the initial sound."
+        feedback = FEEDBACK_NEEDS_PRACTICE
         
-    return {
-        "score": score, 
-        "feedback": feedback, 
-        "target_word": target_word
-    }
+    return AnalysisResult(score, feedback, target_word, features_digest)
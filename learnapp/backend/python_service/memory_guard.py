@@ -0,0 +1,151 @@
+# backend/python-service/memory_guard.py
+
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import worker_stats
+from config import MEMORY_SETTINGS
+
+# Per-worker memory state, reported by /debug/memory. Each worker samples its
+# own RSS in a background thread; the first sample once the worker is warm is
+# the baseline that growth is measured against (warm-up itself allocates caches,
+# compiled kernels etc. that are not a leak).
+MEMORY_STATE = {
+    "pid": None,
+    "baseline_mb": None,
+    "rss_mb": None,
+    "samples": deque(maxlen=MEMORY_SETTINGS["history"]),
+    "recycle": False,       # only set in gunicorn workers, which the master replaces
+    "recycling": False
+}
+_baseline_snapshot = None
+_is_ready = None
+_start_lock = threading.Lock()
+
+# Allocations of the tracing machinery itself are not interesting
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+
+def enable_recycling():
+    """Let this process ask to be replaced when it grows too much (called in gunicorn's post_fork)."""
+    MEMORY_STATE["recycle"] = True
+
+
+def _rss_mb():
+    memory = worker_stats.process_memory(os.getpid()) or {}
+    return memory.get("rss_mb", memory.get("max_rss_mb"))
+
+
+def start(is_ready=None):
+    """
+    Start sampling in this process (once per pid; threads do not survive a fork).
+    is_ready: callable that is true once warm-up has finished; growth is measured
+    from the first sample after that (immediately when not given).
+    """
+    global _baseline_snapshot, _is_ready
+    with _start_lock:
+        if MEMORY_STATE["pid"] == os.getpid():
+            return
+        MEMORY_STATE["pid"] = os.getpid()
+        MEMORY_STATE["baseline_mb"] = None
+        MEMORY_STATE["samples"].clear()
+        MEMORY_STATE["recycling"] = False
+        _baseline_snapshot = None
+        _is_ready = is_ready
+
+        if MEMORY_SETTINGS["tracemalloc"] and not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_SETTINGS["tracemalloc_frames"])
+
+        threading.Thread(target=_sample_loop, args=(os.getpid(),), name="memory-sampler", daemon=True).start()
+
+
+def _sample_loop(pid):
+    while MEMORY_STATE["pid"] == pid:
+        sample()
+        time.sleep(MEMORY_SETTINGS["sample_interval"])
+
+
+def sample():
+    """Record the current RSS, and ask for this worker to be replaced if it has grown too much."""
+    global _baseline_snapshot
+    rss = _rss_mb()
+    if rss is None:
+        return
+    MEMORY_STATE["rss_mb"] = rss
+    MEMORY_STATE["samples"].append((round(time.time(), 1), rss))
+    if MEMORY_STATE["baseline_mb"] is None:
+        if _is_ready is None or _is_ready():
+            MEMORY_STATE["baseline_mb"] = rss
+            if tracemalloc.is_tracing():
+                _baseline_snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        return
+
+    growth = rss - MEMORY_STATE["baseline_mb"]
+    limit = MEMORY_SETTINGS["max_growth_mb"]
+    if limit is not None and growth > limit and MEMORY_STATE["recycle"] and not MEMORY_STATE["recycling"]:
+        MEMORY_STATE["recycling"] = True
+        print(f"INFO: Worker {os.getpid()} grew {growth:.0f} MB since warm-up (limit {limit} MB); recycling it")
+        # Same as gunicorn's own max_requests: finish in-flight requests, exit, and
+        # let the master fork a fresh worker from its warm copy
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+def top_allocators(limit: int = 10):
+    """
+    Largest live allocations by source line, and the lines whose allocations grew
+    most since this worker finished warming up. Empty unless tracemalloc is enabled.
+    """
+    if not tracemalloc.is_tracing():
+        return {"enabled": False}
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+    current, peak = tracemalloc.get_traced_memory()
+
+    def location(stat):
+        frame = stat.traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+    report = {
+        "enabled": True,
+        "traced_mb": round(current / 2 ** 20, 2),
+        "traced_peak_mb": round(peak / 2 ** 20, 2),
+        "top": [
+            {"location": location(stat), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+    }
+    if _baseline_snapshot is not None:
+        report["growth"] = [
+            {"location": location(stat), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+            for stat in snapshot.compare_to(_baseline_snapshot, "lineno")[:limit]
+        ]
+    return report
+
+
+def report(limit: int = 10):
+    """Everything /debug/memory shows for this worker."""
+    rss = _rss_mb()
+    baseline = MEMORY_STATE["baseline_mb"]
+    return {
+        "pid": os.getpid(),
+        "rss_mb": rss,
+        "baseline_mb": baseline,
+        "growth_mb": round(rss - baseline, 1) if rss is not None and baseline is not None else None,
+        "recycle": {
+            "enabled": MEMORY_STATE["recycle"],
+            "max_growth_mb": MEMORY_SETTINGS["max_growth_mb"],
+            "max_requests": MEMORY_SETTINGS["max_requests"],
+            "pending": MEMORY_STATE["recycling"]
+        },
+        "samples": list(MEMORY_STATE["samples"]),
+        "tracemalloc": top_allocators(limit)
+    }
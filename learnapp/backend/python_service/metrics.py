@@ -0,0 +1,79 @@
+# backend/python-service/metrics.py
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# In-process counters and timers, reported by the /metrics endpoint.
+# Each server worker keeps its own; the response says which pid answered.
+
+# Recent observations kept per timer for percentiles
+WINDOW = 1024
+
+_lock = threading.Lock()
+_counters = {}
+_timers = {}
+
+
+class _Timer:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WINDOW)
+
+    def snapshot(self):
+        ordered = sorted(self.recent)
+
+        def percentile(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else None,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+def increment(name: str, amount: int = 1):
+    """Add to a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name: str, seconds: float):
+    """Record one duration for a timer."""
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = _Timer()
+        timer.count += 1
+        timer.total += seconds
+        timer.max = max(timer.max, seconds)
+        timer.recent.append(seconds)
+
+
+@contextmanager
+def timed(name: str):
+    """Time the enclosed block into the named timer."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def snapshot():
+    """Current counters and timer summaries."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timers": {name: timer.snapshot() for name, timer in _timers.items()}
+        }
@@ -0,0 +1,343 @@
+# backend/python-service/phonetic.py
+
+import hashlib
+import os
+import pickle
+
+# --- Phonetic keys ---
+# A compact Metaphone variant: words that sound alike map to the same consonant
+# skeleton (vowels are only kept in first position). "0" stands for "th".
+
+VOWELS = frozenset("AEIOU")
+FRONT_VOWELS = frozenset("EIY")
+
+
+def phonetic_key(word: str):
+    """Convert a word to its Metaphone-style phonetic key (e.g. "phone" -> "FN")."""
+    w = "".join(ch for ch in word.upper() if "A" <= ch <= "Z")
+    if not w:
+        return ""
+
+    # Silent or altered leading letters
+    if w[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        w = w[1:]
+    elif w[0] == "X":
+        w = "S" + w[1:]
+    elif w[:2] == "WH":
+        w = "W" + w[2:]
+
+    key = []
+    n = len(w)
+    i = 0
+    while i < n:
+        ch = w[i]
+        prev = w[i - 1] if i > 0 else ""
+        nxt = w[i + 1] if i + 1 < n else ""
+        after = w[i + 2] if i + 2 < n else ""
+
+        # Doubled letters sound once (except "cc" as in "accent")
+        if ch == prev and ch != "C":
+            i += 1
+            continue
+
+        if ch in VOWELS:
+            if i == 0:
+                key.append(ch)
+        elif ch == "B":
+            # Silent in a final "mb" ("lamb")
+            if not (prev == "M" and i == n - 1):
+                key.append("B")
+        elif ch == "C":
+            if nxt == "I" and after == "A":
+                key.append("X")
+            elif nxt == "H":
+                key.append("K" if prev == "S" else "X")
+                i += 1
+            elif nxt in FRONT_VOWELS:
+                if prev != "S":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif ch == "D":
+            if nxt == "G" and after in FRONT_VOWELS:
+                key.append("J")
+                i += 2
+            else:
+                key.append("T")
+        elif ch == "G":
+            if nxt == "H":
+                # "gh" is only voiced before a vowel ("ghost" vs "night")
+                if after in VOWELS:
+                    key.append("K")
+                i += 1
+            elif nxt == "N" and (i + 2 == n or w[i + 2:] == "ED"):
+                pass
+            elif nxt in FRONT_VOWELS:
+                key.append("J")
+            else:
+                key.append("K")
+        elif ch == "H":
+            if nxt in VOWELS and prev not in ("C", "G", "P", "S", "T"):
+                key.append("H")
+        elif ch == "K":
+            if prev != "C":
+                key.append("K")
+        elif ch == "P":
+            if nxt == "H":
+                key.append("F")
+                i += 1
+            else:
+                key.append("P")
+        elif ch == "Q":
+            key.append("K")
+        elif ch == "S":
+            if nxt == "H":
+                key.append("X")
+                i += 1
+            elif nxt == "I" and after in ("O", "A"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif ch == "T":
+            if nxt == "I" and after in ("O", "A"):
+                key.append("X")
+            elif nxt == "H":
+                key.append("0")
+                i += 1
+            elif not (nxt == "C" and after == "H"):
+                key.append("T")
+        elif ch == "V":
+            key.append("F")
+        elif ch in ("W", "Y"):
+            if nxt in VOWELS:
+                key.append(ch)
+        elif ch == "X":
+            key.append("KS")
+        elif ch == "Z":
+            key.append("S")
+        else:
+            # F, J, L, M, N, R map to themselves
+            key.append(ch)
+        i += 1
+
+    return "".join(key)
+
+
+# --- Weighted edit distance ---
+# Substituting sounds a learner commonly confuses (b/p, f/th, l/r, ...) costs 1,
+# any other substitution 2, insertions and deletions 2. With costs in {1, 2} the
+# distance is a true metric, which the BK-tree below relies on.
+
+CONFUSABLE_GROUPS = [
+    "BP", "F0", "T0", "FP", "SX", "SKX", "JX", "KJ", "MN", "LR", "RW", "WF", "HF", "AEIOU"
+]
+_CONFUSABLE = {(a, b) for group in CONFUSABLE_GROUPS for a in group for b in group if a != b}
+
+SUBSTITUTION_COST = 2
+CONFUSABLE_COST = 1
+INDEL_COST = 2
+
+
+def weighted_edit_distance(a: str, b: str):
+    """Edit distance between two phonetic keys, with cheap substitutions for confusable sounds."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(0, (len(b) + 1) * INDEL_COST, INDEL_COST))
+    for i, ca in enumerate(a, start=1):
+        current = [i * INDEL_COST]
+        for j, cb in enumerate(b, start=1):
+            if ca == cb:
+                substitution = previous[j - 1]
+            elif (ca, cb) in _CONFUSABLE:
+                substitution = previous[j - 1] + CONFUSABLE_COST
+            else:
+                substitution = previous[j - 1] + SUBSTITUTION_COST
+            current.append(min(substitution, previous[j] + INDEL_COST, current[j - 1] + INDEL_COST))
+        previous = current
+    return previous[-1]
+
+
+def spelling_similarity(a: str, b: str):
+    """Plain (unweighted) Levenshtein similarity of two spellings, from 0.0 to 1.0."""
+    if a == b:
+        return 1.0
+    longest = max(len(a), len(b))
+    if longest == 0:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j - 1] + (ca != cb), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return 1.0 - previous[-1] / longest
+
+
+def key_similarity(key_a: str, key_b: str):
+    """Weighted edit distance between phonetic keys, normalised to 0.0 - 1.0."""
+    longest = max(len(key_a), len(key_b))
+    if longest == 0:
+        return 1.0
+    return max(0.0, 1.0 - weighted_edit_distance(key_a, key_b) / (INDEL_COST * longest))
+
+
+# Keys only keep consonant skeletons ("red" and "read" share "RT"), so the
+# spelling carries some weight too
+PHONETIC_WEIGHT = 0.7
+
+
+def pronunciation_similarity(heard: str, target: str):
+    """How close a recognised word sounds to the target, from 0.0 to 1.0."""
+    heard = heard.lower().strip()
+    target = target.lower().strip()
+    if heard == target:
+        return 1.0
+    phonetic = key_similarity(phonetic_key(heard), phonetic_key(target))
+    return PHONETIC_WEIGHT * phonetic + (1 - PHONETIC_WEIGHT) * spelling_similarity(heard, target)
+
+
+# --- BK-tree index ---
+
+# Bump whenever phonetic_key's rules change, so trees cached on disk by
+# PhoneticMatcher.for_lexicon are rebuilt. The confusable groups and costs are
+# part of the cache name too, so editing them needs no bump.
+PHONETIC_INDEX_VERSION = 1
+PHONETIC_INDEX_FINGERPRINT = hashlib.sha1(repr((
+    PHONETIC_INDEX_VERSION, CONFUSABLE_GROUPS, SUBSTITUTION_COST, CONFUSABLE_COST, INDEL_COST
+)).encode()).hexdigest()[:12]
+
+class BKTree:
+    """
+    Burkhard-Keller tree over phonetic keys for sublinear near-neighbour lookups.
+
+    Stored as flat lists (key, words sharing the key, {distance: child node})
+    instead of nested nodes, so large trees pickle and load quickly.
+    """
+    def __init__(self):
+        self.keys = []
+        self.words = []
+        self.children = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, word: str, key: str = None):
+        key = phonetic_key(word) if key is None else key
+        if not key:
+            return
+        if not self.keys:
+            self._new_node(key, word)
+            return
+
+        node = 0
+        while True:
+            distance = weighted_edit_distance(key, self.keys[node])
+            if distance == 0:
+                if word not in self.words[node]:
+                    self.words[node].append(word)
+                return
+            child = self.children[node].get(distance)
+            if child is None:
+                self.children[node][distance] = self._new_node(key, word)
+                return
+            node = child
+
+    def _new_node(self, key, word):
+        self.keys.append(key)
+        self.words.append([word])
+        self.children.append({})
+        return len(self.keys) - 1
+
+    def search(self, key: str, max_distance: int):
+        """Return (distance, word) pairs whose keys lie within max_distance of key."""
+        if not self.keys or not key:
+            return []
+        results = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = weighted_edit_distance(key, self.keys[node])
+            if distance <= max_distance:
+                results.extend((distance, word) for word in self.words[node])
+            # Triangle inequality: only subtrees in [d - r, d + r] can contain matches
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in self.children[node].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return results
+
+
+class PhoneticMatcher:
+    """
+    Scores recognised speech against target words and suggests near misses.
+
+    The vocabulary is indexed once in a BK-tree keyed on phonetic keys, so ranking
+    candidates for a recognised word only visits a small part of a large lexicon.
+    """
+    def __init__(self, words=(), threshold: float = 0.7, max_distance: int = 2):
+        self.threshold = threshold
+        self.max_distance = max_distance
+        self.tree = BKTree()
+        for word in words:
+            self.tree.add(word.lower())
+
+    @classmethod
+    def for_lexicon(cls, lexicon, threshold: float = 0.7, max_distance: int = 2):
+        """
+        Build a matcher over every lexicon word, caching the tree next to the lexicon
+        index so later processes load it instead of rebuilding it. The cache is keyed
+        on the lexicon's mtime and on PHONETIC_INDEX_FINGERPRINT.
+        """
+        matcher = cls(threshold=threshold, max_distance=max_distance)
+        cache_path = f"{os.path.splitext(lexicon.index_path)[0]}.bktree.{PHONETIC_INDEX_FINGERPRINT}.pickle"
+        lexicon_mtime = os.path.getmtime(lexicon.source_path)
+
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= lexicon_mtime:
+            try:
+                with open(cache_path, "rb") as f:
+                    matcher.tree = pickle.load(f)
+                return matcher
+            except Exception as e:
+                print(f"INFO: Ignoring unreadable phonetic index {cache_path}: {e}")
+
+        for entry in lexicon:
+            matcher.tree.add(entry["word"])
+        for word, variants in lexicon.iter_variants():
+            for variant in variants:
+                matcher.tree.add(word, phonetic_key(variant))
+
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(matcher.tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        return matcher
+
+    def similarity(self, heard: str, target: str):
+        """Pronunciation similarity of a recognised word to the target (0.0 - 1.0)."""
+        return pronunciation_similarity(heard, target)
+
+    def is_match(self, heard: str, target: str):
+        """True if the recognised word sounds close enough to the target."""
+        return self.similarity(heard, target) >= self.threshold
+
+    def candidates(self, heard: str, limit: int = 5):
+        """
+        Vocabulary words that sound like what was recognised, best first.
+
+        Returns a list of (word, similarity) pairs.
+        """
+        heard = heard.lower().strip()
+        nearest = sorted(self.tree.search(phonetic_key(heard), self.max_distance))
+
+        # Only the phonetically nearest few are worth the finer spelling-aware score
+        matches = {}
+        for _, word in nearest:
+            if word not in matches:
+                matches[word] = pronunciation_similarity(heard, word)
+                if len(matches) >= limit * 4:
+                    break
+        ranked = sorted(matches.items(), key=lambda item: (-item[1], item[0]))
+        return [(word, round(score, 2)) for word, score in ranked[:limit]]
@@ -0,0 +1,202 @@
+# backend/python-service/scheduler.py
+
+import heapq
+import itertools
+import time
+
+# Harder words come back sooner: every review interval is divided by this weight
+DIFFICULTY_WEIGHTS = {"easy": 0.8, "medium": 1.0, "hard": 1.3}
+
+# Review intervals in seconds (SM-2 style ladder, shortened so a failed word
+# can come back within the same practice session)
+RELEARN_INTERVAL = 60
+FIRST_INTERVAL = 10 * 60
+SECOND_INTERVAL = 24 * 60 * 60
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+
+class WordState:
+    """Spaced-repetition state for one word the learner has already attempted."""
+    __slots__ = ("word", "difficulty", "ease", "interval", "repetitions", "lapses",
+                 "attempts", "successes", "due", "version")
+
+    def __init__(self, word, difficulty):
+        self.word = word
+        self.difficulty = difficulty
+        self.ease = DEFAULT_EASE
+        self.interval = 0.0
+        self.repetitions = 0
+        self.lapses = 0
+        self.attempts = 0
+        self.successes = 0
+        self.due = 0.0
+        self.version = 0
+
+    def to_dict(self):
+        return {
+            "word": self.word,
+            "difficulty": self.difficulty,
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "lapses": self.lapses,
+            "ease": round(self.ease, 2),
+            "interval_seconds": round(self.interval),
+            "due": self.due
+        }
+
+
+class SpacedRepetitionScheduler:
+    """
+    Chooses the next word to practise from the learner's attempt history.
+
+    Words the learner has attempted live in a min-heap ordered by due time, so
+    picking the next review and rescheduling after an attempt are both O(log n).
+    Rescheduled words leave their old heap entry behind; it is recognised by its
+    stale version number and discarded when it reaches the top (lazy deletion).
+    Words never attempted are not materialised at all: they are introduced in
+    word-bank order from a cursor, which keeps large word banks cheap per learner.
+    """
+    def __init__(self, words, clock=time.time):
+        # words: sequence of dicts with at least "word" and "difficulty" keys, or a
+        # Lexicon, whose indexed get() is used directly instead of building a dict
+        self.words = words
+        self.clock = clock
+        if hasattr(words, "get"):
+            self._lookup = words.get
+        else:
+            self._lookup = {entry["word"].lower(): entry for entry in words}.get
+        self._states = {}
+        self._heap = []
+        self._new_cursor = 0
+        self._tiebreak = itertools.count()
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def seen_count(self):
+        """Number of distinct words the learner has attempted."""
+        return len(self._states)
+
+    def _push(self, state):
+        heapq.heappush(self._heap, (state.due, next(self._tiebreak), state.version, state.word))
+
+        # Replaying a long history leaves many stale entries behind; rebuild once
+        # they outnumber the live ones so the heap stays proportional to seen words
+        if len(self._heap) > 2 * len(self._states) + 64:
+            self._heap = [
+                (s.due, next(self._tiebreak), s.version, s.word) for s in self._states.values()
+            ]
+            heapq.heapify(self._heap)
+
+    def _peek_due(self):
+        """Return the state with the earliest due time, discarding stale heap entries."""
+        while self._heap:
+            due, _, version, word = self._heap[0]
+            state = self._states[word]
+            if state.version == version:
+                return state
+            heapq.heappop(self._heap)
+        return None
+
+    def _next_new_word(self):
+        """Return the next word-bank entry that has never been attempted."""
+        while self._new_cursor < len(self.words):
+            entry = self.words[self._new_cursor]
+            if entry["word"].lower() not in self._states:
+                return entry
+            self._new_cursor += 1
+        return None
+
+    def next_word(self, due_only: bool = False):
+        """
+        Pick the word to practise next.
+
+        Reviews that are already due win over new words; otherwise the next unseen
+        word is introduced. When everything has been seen and nothing is due, the
+        earliest upcoming review is returned, or None if due_only is set.
+        """
+        now = self.clock()
+        review = self._peek_due()
+
+        if review is not None and review.due <= now:
+            return self._lookup(review.word)
+
+        new_entry = self._next_new_word()
+        if new_entry is not None:
+            return new_entry
+
+        if review is None or due_only:
+            return None
+        return self._lookup(review.word)
+
+    def record_result(self, word: str, score: float, timestamp: float = None):
+        """
+        Update a word's schedule after an attempt.
+
+        Args:
+            word (str): The practised word.
+            score (float): Attempt quality from 0.0 (failed) to 1.0 (perfect).
+            timestamp (float): When the attempt happened (defaults to now).
+        """
+        key = word.lower()
+        entry = self._lookup(key)
+        if entry is None:
+            # Words outside the bank (e.g. removed from the lexicon) are not scheduled
+            return None
+
+        now = timestamp if timestamp is not None else self.clock()
+        state = self._states.get(key)
+        if state is None:
+            state = WordState(key, entry.get("difficulty", "medium"))
+            self._states[key] = state
+
+        # SM-2: map the score to a 0-5 quality grade and update the ease factor
+        quality = max(0.0, min(5.0, score * 5))
+        state.attempts += 1
+        state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        if quality < 3:
+            state.repetitions = 0
+            state.lapses += 1
+            interval = RELEARN_INTERVAL
+        else:
+            state.successes += 1
+            state.repetitions += 1
+            if state.repetitions == 1:
+                interval = FIRST_INTERVAL
+            elif state.repetitions == 2:
+                interval = SECOND_INTERVAL
+            else:
+                interval = state.interval * state.ease
+
+        state.interval = interval
+        state.due = now + interval / DIFFICULTY_WEIGHTS.get(state.difficulty, 1.0)
+        state.version += 1
+        self._push(state)
+        return state
+
+    def load_history(self, attempts):
+        """Replay (word, score, timestamp) tuples, oldest first, to rebuild the schedule."""
+        for word, score, timestamp in attempts:
+            self.record_result(word, score, timestamp)
+
+    def max_attempts(self, word: str, base: int = 3):
+        """How many tries to allow for a word, based on how the learner has done with it."""
+        state = self._states.get(word.lower())
+        if state is None:
+            return base
+        if state.lapses >= 2 and state.successes <= state.lapses:
+            # Struggling word: allow an extra try before moving on
+            return base + 1
+        if state.repetitions >= 3:
+            # Well-learned word: a single confirmation is enough
+            return 1
+        return base
+
+    def word_state(self, word: str):
+        """Scheduling details for a word, or None if it has never been attempted."""
+        state = self._states.get(word.lower())
+        return state.to_dict() if state else None
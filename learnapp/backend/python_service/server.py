@@ -1,5 +1,9 @@
 import uvicorn
 
+# Development server (single process, auto-reload).
+# For production with several workers sharing one preloaded model, run:
+#   gunicorn -c gunicorn_conf.py app:app
+
 if __name__ == "__main__":
     uvicorn.run(
         "app:app",
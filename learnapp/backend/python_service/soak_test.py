@@ -0,0 +1,244 @@
+# backend/python-service/soak_test.py
+
+"""
+Soak test: hours of synthetic /analyze/ traffic against a running server,
+failing if worker memory or tail latency drifts.
+
+    PRONUNCIATION_RECYCLE=0 gunicorn -c gunicorn_conf.py app:app    # in another shell
+    python soak_test.py --url http://127.0.0.1:8000 --duration 10800
+
+Every window (SOAK_SETTINGS["window"] seconds) it prints the request count,
+errors, p50/p99 latency and the total memory of the server workers (PSS where
+the kernel reports it, so pages shared with the master are not counted once
+per worker). At the end the last window is compared with the first (with
+three or more windows, the second: the first still includes the workers' own
+warm-up), and the exit status is 1 if memory grew by more than
+max_rss_growth_mb or p99 by more than max_p99_growth.
+
+Worker recycling (MEMORY_SETTINGS) hides slow leaks by replacing the grown
+worker, so the server must run with PRONUNCIATION_RECYCLE=0: the test refuses
+to start against a server that recycles, and fails if worker pids change
+between windows anyway (e.g. a crashed worker).
+"""
+
+import argparse
+import io
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+import soundfile as sf
+
+from config import SOAK_SETTINGS
+from synthetic_audio import synthetic_clip
+
+SAMPLE_RATES = [16000, 44100]
+TARGET_WORDS = ["hello", "apple", "water", "computer"]
+# Distinct clips per (duration, rate), so concurrent requests are rarely
+# identical and coalesced into one analysis
+CLIP_VARIANTS = 8
+
+
+def _multipart_body(target_word: str, wav: bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="target_word"\r\n\r\n{target_word}\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="soak.wav"\r\n'
+        f"Content-Type: audio/wav\r\n\r\n"
+    ).encode() + wav + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _request_bodies(clip_durations):
+    bodies = []
+    seed = 0
+    for duration in clip_durations:
+        for rate in SAMPLE_RATES:
+            for _ in range(CLIP_VARIANTS):
+                buffer = io.BytesIO()
+                sf.write(buffer, synthetic_clip(duration, rate, seed=seed), rate, format="WAV")
+                bodies.append(_multipart_body(TARGET_WORDS[seed % len(TARGET_WORDS)], buffer.getvalue()))
+                seed += 1
+    return bodies
+
+
+def _get_json(url: str, timeout: float):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def _wait_until_ready(base_url: str, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if _get_json(f"{base_url}/ready", timeout=5)[0] == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(1)
+    return False
+
+
+def _recycling(base_url: str):
+    """The server's worker recycling limits, or None if recycling is off."""
+    _, body = _get_json(f"{base_url}/debug/memory?limit=0", timeout=10)
+    recycle = body["recycle"]
+    # "enabled" is only set in gunicorn workers, the only ones that can be replaced
+    if recycle["enabled"] and (recycle["max_requests"] or recycle["max_growth_mb"] is not None):
+        return {"max_requests": recycle["max_requests"], "max_growth_mb": recycle["max_growth_mb"]}
+    return None
+
+
+def _worker_memory(base_url: str):
+    """Total memory (MB) of the server workers and their pids."""
+    _, body = _get_json(f"{base_url}/workers", timeout=10)
+    total = 0.0
+    pids = set()
+    for process in body["processes"]:
+        if process["role"] == "master":
+            continue
+        memory = process.get("memory") or {}
+        total += memory.get("pss_mb", memory.get("rss_mb", 0.0))
+        pids.add(process["pid"])
+    return round(total, 1), pids
+
+
+def _client(base_url, bodies, offset, stop_at, results, lock, timeout):
+    """Send requests back to back until stop_at, recording (latency, status)."""
+    i = offset
+    while time.monotonic() < stop_at:
+        body, content_type = bodies[i % len(bodies)]
+        i += 1
+        request = urllib.request.Request(
+            f"{base_url}/analyze/", data=body,
+            headers={"Content-Type": content_type, "X-Request-Timeout-Ms": str(int(timeout * 1000))}
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            status = None
+        latency = time.perf_counter() - started
+        with lock:
+            results.append((latency, status))
+
+
+def _summarise(results, memory_mb):
+    latencies = np.array([latency for latency, status in results if status == 200])
+    return {
+        "requests": len(results),
+        "errors": sum(status != 200 for _, status in results),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies.size else None,
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 1) if latencies.size else None,
+        "memory_mb": memory_mb
+    }
+
+
+def run(base_url: str, duration: float, concurrency: int, window: float,
+        max_rss_growth_mb: float, max_p99_growth: float):
+    """Run the soak test; returns True if memory and p99 stayed within the thresholds."""
+    base_url = base_url.rstrip("/")
+    if duration <= 0 or window <= 0:
+        print("ERROR: --duration and --window must be positive")
+        return False
+    if not _wait_until_ready(base_url):
+        print(f"ERROR: {base_url} did not become ready")
+        return False
+    recycling = _recycling(base_url)
+    if recycling is not None:
+        print(f"ERROR: {base_url} recycles workers ({recycling}); memory drift would be measured on fresh "
+              f"workers. Restart it with PRONUNCIATION_RECYCLE=0")
+        return False
+
+    bodies = _request_bodies(SOAK_SETTINGS["clip_durations"])
+    results = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    clients = [
+        threading.Thread(target=_client, daemon=True,
+                         args=(base_url, bodies, n * 7, stop_at, results, lock, SOAK_SETTINGS["request_timeout"]))
+        for n in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    print(f"Soaking {base_url} for {duration:.0f}s with {concurrency} clients ({window:.0f}s windows)")
+
+    windows = []
+    previous_pids = None
+    replaced = False
+    while time.monotonic() < stop_at:
+        time.sleep(max(0.0, min(window, stop_at - time.monotonic())))
+        with lock:
+            window_results, results[:] = results[:], []
+        memory_mb, pids = _worker_memory(base_url)
+        if previous_pids is not None and pids != previous_pids:
+            print("WARNING: workers were replaced during this window; memory drift is not comparable")
+            replaced = True
+        previous_pids = pids
+
+        summary = _summarise(window_results, memory_mb)
+        windows.append(summary)
+        print(f"[window {len(windows)}] {summary['requests']} requests, {summary['errors']} errors, "
+              f"p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, workers {summary['memory_mb']} MB")
+
+    for client in clients:
+        client.join(timeout=SOAK_SETTINGS["request_timeout"])
+
+    first = windows[1] if len(windows) > 2 else windows[0]
+    last = windows[-1]
+    passed = True
+    memory_growth = last["memory_mb"] - first["memory_mb"]
+    print(f"Worker memory: {first['memory_mb']} -> {last['memory_mb']} MB ({memory_growth:+.1f} MB, limit {max_rss_growth_mb} MB)")
+    if replaced:
+        print("FAIL: workers were replaced during the run, so their memory cannot be compared")
+        passed = False
+    elif memory_growth > max_rss_growth_mb:
+        print("FAIL: worker memory drifted beyond the threshold")
+        passed = False
+
+    if first["p99_ms"] is None or last["p99_ms"] is None:
+        print("FAIL: no successful requests in the first or last window")
+        passed = False
+    else:
+        p99_growth = last["p99_ms"] / first["p99_ms"] - 1
+        print(f"p99 latency: {first['p99_ms']} -> {last['p99_ms']} ms ({p99_growth:+.0%}, limit {max_p99_growth:+.0%})")
+        if p99_growth > max_p99_growth:
+            print("FAIL: p99 latency drifted beyond the threshold")
+            passed = False
+
+    print("PASS" if passed else "Soak test failed")
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak a running pronunciation server and check for memory/latency drift.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the server")
+    parser.add_argument("--duration", type=float, default=SOAK_SETTINGS["duration"], help="seconds")
+    parser.add_argument("--concurrency", type=int, default=SOAK_SETTINGS["concurrency"])
+    parser.add_argument("--window", type=float, default=SOAK_SETTINGS["window"], help="seconds per measurement window")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=SOAK_SETTINGS["max_rss_growth_mb"])
+    parser.add_argument("--max-p99-growth", type=float, default=SOAK_SETTINGS["max_p99_growth"],
+                        help="allowed relative p99 increase, e.g. 0.5 for +50%%")
+    args = parser.parse_args(argv)
+
+    passed = run(args.url, args.duration, args.concurrency, args.window,
+                 args.max_rss_growth_mb, args.max_p99_growth)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
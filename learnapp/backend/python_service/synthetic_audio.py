@@ -0,0 +1,17 @@
+# backend/python-service/synthetic_audio.py
+
+import numpy as np
+
+# Test signals for warm-up and load testing. Only needs NumPy, so load
+# generators can use it without importing librosa or loading the model.
+
+
+def synthetic_clip(duration: float, sample_rate: int, seed: int = 0):
+    """A speech-like test signal: a gliding harmonic tone with a little noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pitch = 120 + 60 * t / max(duration, 1e-3)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.hanning(len(t)) if len(t) > 1 else np.ones(len(t))
+    return (0.3 * voiced * envelope + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
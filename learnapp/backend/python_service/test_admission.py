@@ -0,0 +1,84 @@
+# backend/python-service/test_admission.py
+
+import asyncio
+import time
+
+import pytest
+
+from admission import AdmissionController, DeadlineExceeded, Overloaded
+
+
+def _controller(max_concurrent=1, max_queued=2):
+    return AdmissionController(max_concurrent, {"interactive": max_queued, "batch": max_queued})
+
+
+async def _hold(controller, ticket, seconds, order=None, name=None):
+    async with controller.slot(ticket):
+        if order is not None:
+            order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_free_slot_goes_to_interactive_before_batch():
+    async def scenario():
+        controller = _controller()
+        soon = time.monotonic() + 5
+        order = []
+        tasks = [asyncio.ensure_future(_hold(controller, controller.ticket("interactive", soon), 0.05, order, "first"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(_hold(controller, controller.ticket("batch", soon), 0, order, "batch")))
+        tasks.append(asyncio.ensure_future(_hold(controller, controller.ticket("interactive", soon), 0, order, "interactive")))
+        await asyncio.gather(*tasks)
+        return order, controller.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["first", "interactive", "batch"]
+    assert stats["active"] == 0
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        controller = _controller(max_queued=1)
+        soon = time.monotonic() + 5
+        running = asyncio.ensure_future(_hold(controller, controller.ticket("batch", soon), 0.05))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(_hold(controller, controller.ticket("batch", soon), 0))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await controller.acquire(controller.ticket("batch", soon))
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+
+
+def test_waiter_expires_at_its_deadline_and_frees_its_place():
+    async def scenario():
+        controller = _controller()
+        running = asyncio.ensure_future(_hold(controller, controller.ticket("interactive", time.monotonic() + 5), 0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceeded):
+            await controller.acquire(controller.ticket("interactive", time.monotonic() + 0.02))
+        assert controller.queued() == {"interactive": 0, "batch": 0}
+        await running
+        return controller.stats()
+
+    assert asyncio.run(scenario())["active"] == 0
+
+
+def test_merged_ticket_extends_deadline_and_raises_lane_while_queued():
+    async def scenario():
+        controller = _controller()
+        order = []
+        blocker = asyncio.ensure_future(_hold(controller, controller.ticket("interactive", time.monotonic() + 5), 0.1))
+        await asyncio.sleep(0)
+        other = asyncio.ensure_future(_hold(controller, controller.ticket("batch", time.monotonic() + 5), 0, order, "other"))
+        await asyncio.sleep(0)
+        shared = controller.ticket("batch", time.monotonic() + 0.02)
+        merged = asyncio.ensure_future(_hold(controller, shared, 0, order, "merged"))
+        await asyncio.sleep(0)
+        shared.merge(controller.ticket("interactive", time.monotonic() + 5))
+        assert controller.queued() == {"interactive": 1, "batch": 1}
+        await asyncio.gather(blocker, other, merged)
+        return order
+
+    assert asyncio.run(scenario()) == ["merged", "other"]
@@ -0,0 +1,67 @@
+# backend/python-service/test_attempt_store.py
+
+import sqlite3
+
+import pytest
+
+from attempt_store import AttemptStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AttemptStore(str(tmp_path / "attempts.db"), flush_interval=0.01)
+
+
+def _record_all(store, attempts):
+    for n, (user_id, word, score) in enumerate(attempts):
+        store.record_attempt(user_id, word, score, timestamp=1000.0 + n)
+    # Commits everything queued and stops the writer
+    store.close()
+
+
+def test_triggers_maintain_per_user_and_per_word_aggregates(store):
+    _record_all(store, [
+        ("ana", "Apple", 0.2), ("ana", "apple", 0.6), ("ana", "water", 0.9), ("ben", "apple", 1.0),
+    ])
+
+    by_word = {row["word"]: row for row in store.weakest_words("ana", limit=10)}
+    apple = by_word["apple"]
+    assert apple["attempts"] == 2
+    assert apple["mean_score"] == pytest.approx(0.4)
+    assert (apple["best_score"], apple["last_score"], apple["last_attempt_at"]) == (0.6, 0.6, 1001.0)
+
+    overall = store.word_stats("APPLE")
+    assert overall["attempts"] == 3
+    assert overall["mean_score"] == pytest.approx(0.6)
+    assert store.word_stats("banana") is None
+
+
+def test_weakest_words_are_sorted_and_filtered(store):
+    _record_all(store, [
+        ("ana", "apple", 0.9), ("ana", "water", 0.1), ("ana", "water", 0.3), ("ana", "house", 0.5),
+    ])
+    assert [row["word"] for row in store.weakest_words("ana")] == ["water", "house", "apple"]
+    assert [row["word"] for row in store.weakest_words("ana", limit=1)] == ["water"]
+    assert [row["word"] for row in store.weakest_words("ana", min_attempts=2)] == ["water"]
+
+
+def test_history_and_attempts_since(store):
+    _record_all(store, [("ana", "apple", 0.5), ("ben", "water", 0.7), ("ana", "house", 0.8)])
+
+    assert [row["word"] for row in store.user_history("ana", limit=1)] == ["house"]
+
+    attempts = store.user_attempts_since("ana")
+    assert [(word, score) for _, word, score, _ in attempts] == [("apple", 0.5), ("house", 0.8)]
+    assert store.user_attempts_since("ana", attempts[0][0]) == attempts[1:]
+
+
+def test_unused_word_index_is_dropped(tmp_path):
+    path = str(tmp_path / "attempts.db")
+    AttemptStore(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE INDEX idx_attempts_word ON attempts (word)")
+    conn.commit()
+    AttemptStore(path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert "idx_attempts_word" not in indexes
@@ -0,0 +1,84 @@
+# backend/python-service/test_batch_score.py
+
+import csv
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from joblib import dump
+from sklearn.linear_model import LogisticRegression
+
+import batch_score
+from batch_score import READ_ERROR_PREFIX, CsvOutput, resume_keys
+from features import N_MFCC
+
+
+def test_resume_keys_use_the_latest_row_per_clip():
+    rows = [
+        (("a.wav", "red"), None),
+        (("b.wav", "red"), "LibsndfileError: unknown format"),
+        (("c.wav", "red"), READ_ERROR_PREFIX + "FileNotFoundError: missing"),
+        (("d.wav", "red"), READ_ERROR_PREFIX + "PermissionError: denied"),
+        (("d.wav", "red"), None),
+    ]
+    assert resume_keys(rows) == {("a.wav", "red"), ("b.wav", "red"), ("d.wav", "red")}
+    assert resume_keys(rows, retry_failed=True) == {("a.wav", "red"), ("d.wav", "red")}
+
+
+@pytest.mark.parametrize("partial", [b"c.wav,red,", b"x" * 200000])
+def test_partial_last_line_is_dropped(tmp_path, partial):
+    path = tmp_path / "scores.csv"
+    complete = b"audio,target_word,label,score,features_digest,duration,error\r\na.wav,red,,0.5,abc,1.0,\r\n"
+    path.write_bytes(complete + partial)
+    assert CsvOutput(str(path)).done_keys() == {("a.wav", "red")}
+    assert path.read_bytes() == complete
+
+
+def test_file_without_a_complete_line_is_emptied(tmp_path):
+    path = tmp_path / "scores.csv"
+    path.write_bytes(b"audio,target_" + b"x" * 200000)
+    assert CsvOutput(str(path)).done_keys() == set()
+    assert path.read_bytes() == b""
+
+
+def _wav(seconds=0.6, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    buffer = io.BytesIO()
+    sf.write(buffer, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), sample_rate, format="WAV")
+    return buffer.getvalue()
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_resume_skips_scored_and_undecodable_clips_but_retries_unreadable_ones(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "good.wav").write_bytes(_wav())
+    (corpus / "broken.wav").write_bytes(b"not audio")
+    manifest = corpus / "manifest.csv"
+    manifest.write_text("audio,target_word,label\ngood.wav,red,1\nbroken.wav,red,0\nmissing.wav,red,1\n")
+
+    rng = np.random.default_rng(0)
+    model_path = str(tmp_path / "model.joblib")
+    dump(LogisticRegression().fit(rng.standard_normal((20, N_MFCC)), np.arange(20) % 2), model_path)
+    output = str(tmp_path / "scores.csv")
+
+    def run(**kwargs):
+        batch_score.run(str(manifest), output, model_path=model_path, workers=1, chunk_size=2, **kwargs)
+        return [(row["audio"], bool(row["error"])) for row in _rows(output)]
+
+    first = run()
+    assert first == [("good.wav", False), ("broken.wav", True), ("missing.wav", True)]
+    assert _rows(output)[2]["error"].startswith(READ_ERROR_PREFIX)
+
+    # Only the unreadable file is tried again
+    assert run() == first + [("missing.wav", True)]
+
+    (corpus / "missing.wav").write_bytes(_wav())
+    assert run()[-1] == ("missing.wav", False)
+    assert run(retry_failed=True)[-1] == ("broken.wav", True)
+    assert len(_rows(output)) == 6
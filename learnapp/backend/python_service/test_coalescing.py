@@ -0,0 +1,77 @@
+# backend/python-service/test_coalescing.py
+
+import asyncio
+import time
+
+import pytest
+
+from admission import AdmissionController, DeadlineExceeded
+from coalescing import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def scenario():
+        flights = SingleFlight("test")
+        results = await asyncio.gather(*(flights.do("key", compute, 21) for _ in range(5)))
+        assert flights.in_flight() == 0
+        # Nothing is cached: a later call runs again
+        results.append(await flights.do("key", compute, 21))
+        return results
+
+    assert asyncio.run(scenario()) == [42] * 6
+    assert calls == [21, 21]
+
+
+def test_each_caller_keeps_its_own_deadline():
+    """A follower with a later deadline still gets the result when the leader's deadline passes."""
+    async def scenario():
+        admission = AdmissionController(1, {"interactive": 4, "batch": 4})
+        flights = SingleFlight("test")
+
+        async def compute(value, ticket):
+            async with admission.slot(ticket):
+                await asyncio.sleep(0.1)
+                return value
+
+        now = time.monotonic()
+        leader = asyncio.ensure_future(flights.do("key", compute, "done", ticket=admission.ticket("interactive", now + 0.03)))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", compute, "done", ticket=admission.ticket("batch", now + 5)))
+        with pytest.raises(DeadlineExceeded):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_follower_raises_queued_flight_to_its_lane():
+    async def scenario():
+        admission = AdmissionController(1, {"interactive": 4, "batch": 4})
+        flights = SingleFlight("test")
+        order = []
+
+        async def compute(name, ticket):
+            async with admission.slot(ticket):
+                order.append(name)
+                await asyncio.sleep(0.02)
+                return name
+
+        soon = time.monotonic() + 5
+        tasks = [
+            asyncio.ensure_future(flights.do("a", compute, "a", ticket=admission.ticket("interactive", soon))),
+            asyncio.ensure_future(flights.do("b", compute, "b", ticket=admission.ticket("batch", soon))),
+            asyncio.ensure_future(flights.do("c", compute, "c", ticket=admission.ticket("batch", soon))),
+        ]
+        await asyncio.sleep(0.005)
+        tasks.append(asyncio.ensure_future(flights.do("c", compute, "c", ticket=admission.ticket("interactive", soon))))
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "c", "b"]
@@ -0,0 +1,76 @@
+# backend/python-service/test_colors.py
+
+import sys
+import types
+
+import numpy as np
+import pytest
+
+# Speech recognition is not exercised here; the analyzer only needs the module to construct
+sys.modules.setdefault("speech_recognition", types.SimpleNamespace(Recognizer=lambda: None))
+
+import colors  # noqa: E402
+
+CASES = [
+    # target, recognized text, duration, energy, zero crossing mean
+    ("red", "red", 0.8, 0.05, 0.1),
+    ("blue", "blue", 0.1, 0.0001, 0.01),
+    ("green", "green", 3.0, 0.05, 0.2),
+    ("yellow", "purple", 0.8, 0.05, 0.1),
+    ("pink", None, 0.8, 0.05, 0.1),
+    ("Brown", "brown", 1.0, 0.0005, 0.1),
+    ("teal", "teal", 0.8, 0.05, 0.1),
+]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return colors.ColorsPronunciationAnalyzer()
+
+
+def _per_clip(analyzer, target, recognized, features, monkeypatch):
+    monkeypatch.setattr(analyzer, "recognize_speech", lambda path: recognized)
+    monkeypatch.setattr(analyzer, "extract_pronunciation_features_from_file", lambda path: features)
+    return analyzer.analyze_color_pronunciation(target, "unused.wav")
+
+
+def test_score_batch_matches_the_per_clip_path(analyzer, monkeypatch):
+    targets, correct, recognized, rows, expected = [], [], [], [], []
+    for target, text, duration, energy, zero_crossing in CASES:
+        features = {"duration": duration, "energy": energy, "zero_crossing_mean": zero_crossing}
+        result = _per_clip(analyzer, target, text, features, monkeypatch)
+        targets.append(target)
+        correct.append(result["is_correct_word"])
+        recognized.append(text is not None)
+        rows.append(features)
+        expected.append(result)
+
+    batch = analyzer.score_batch(
+        targets,
+        {name: np.array([row[name] for row in rows]) for name in ("duration", "energy", "zero_crossing_mean")},
+        correct, recognized
+    )
+
+    for i, result in enumerate(expected):
+        assert batch["score"][i] == result["score"], CASES[i]
+        assert batch["rating"][i] == result["rating"], CASES[i]
+        tip = colors.COLOR_FEEDBACK.get(CASES[i][0].lower())
+        has_tip = tip is not None and tip in result["feedback"]
+        assert batch["color_feedback"][i] == (tip if has_tip else None), CASES[i]
+
+
+@pytest.mark.parametrize("target, heard", [
+    ("red", "rod"), ("red", "wed"), ("brown", "crown"), ("brown", "drown"), ("green", "grain")
+])
+def test_sound_alike_words_are_not_the_correct_word(analyzer, monkeypatch, target, heard):
+    features = {"duration": 0.8, "energy": 0.05, "zero_crossing_mean": 0.1}
+    result = _per_clip(analyzer, target, heard, features, monkeypatch)
+    assert not result["is_correct_word"]
+    assert result["score"] == 100 - colors.WRONG_WORD_PENALTY
+    assert f"❌ You said '{heard}', but should be '{target}'" in result["feedback"]
+
+
+def test_near_misses_rank_the_colors_a_wrong_word_sounded_like(analyzer, monkeypatch):
+    features = {"duration": 0.8, "energy": 0.05, "zero_crossing_mean": 0.1}
+    result = _per_clip(analyzer, "blue", "grain", features, monkeypatch)
+    assert result["near_misses"][0] == "green"
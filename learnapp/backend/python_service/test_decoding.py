@@ -0,0 +1,82 @@
+# backend/python-service/test_decoding.py
+
+import io
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from admission import DeadlineExceeded
+from decoding import TARGET_SAMPLE_RATE, AudioDecoder, DecodeError
+
+
+def _wav(seconds=0.5, sample_rate=TARGET_SAMPLE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    buffer = io.BytesIO()
+    sf.write(buffer, (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32), sample_rate, format="WAV")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def decoder():
+    decoder = AudioDecoder(workers=1)
+    yield decoder
+    decoder.shutdown()
+
+
+def _pid(decoder):
+    return decoder._processes[0].process.pid
+
+
+def test_decoder_process_round_trips_samples_and_errors(decoder):
+    decoder.warm_up()
+    pid = _pid(decoder)
+
+    samples = decoder._decode_in_process(_wav())
+    assert samples.dtype == np.float32
+    assert abs(samples.size - TARGET_SAMPLE_RATE // 2) < 100
+
+    # A file the codec rejects is reported, and the process keeps serving
+    with pytest.raises(DecodeError):
+        decoder._decode_in_process(b"not audio at all")
+    assert decoder._decode_in_process(_wav()).size == samples.size
+    assert _pid(decoder) == pid
+
+
+def test_processes_are_recycled_after_max_tasks():
+    decoder = AudioDecoder(workers=1, max_tasks_per_worker=2)
+    try:
+        decoder._decode_in_process(_wav())
+        first = _pid(decoder)
+        decoder._decode_in_process(_wav())
+        assert _pid(decoder) != first
+    finally:
+        decoder.shutdown()
+
+
+def test_dead_process_fails_one_upload_and_is_replaced(decoder):
+    decoder.warm_up()
+    pid = _pid(decoder)
+    os.kill(pid, signal.SIGKILL)
+    decoder._processes[0].process.wait()
+
+    with pytest.raises(DecodeError):
+        decoder._decode_in_process(_wav())
+    assert _pid(decoder) != pid
+    assert decoder._decode_in_process(_wav()).size > 0
+
+
+def test_hung_process_times_out_at_the_deadline_and_is_replaced(decoder):
+    decoder.warm_up()
+    pid = _pid(decoder)
+    os.kill(pid, signal.SIGSTOP)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        decoder.decode(_wav(), "audio/m4a", deadline=time.monotonic() + 0.2)
+    assert time.monotonic() - started < 2
+    assert _pid(decoder) != pid
+    assert decoder._decode_in_process(_wav()).size > 0
@@ -0,0 +1,69 @@
+# backend/python-service/test_lexicon.py
+
+import os
+
+import pytest
+
+from lexicon import Lexicon
+
+ROWS = [
+    ("Hello", "həˈloʊ", "easy", "greetings", "hallo|Hellow"),
+    ("water", "ˈwɔːtər", "easy", "nouns", ""),
+    ("beautiful", "ˈbjuːtɪfəl", "medium", "adjectives", "beautyful"),
+    ("goodbye", "ɡʊdˈbaɪ", "", "greetings", ""),
+]
+
+
+def _write_tsv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("word\tphonetic\tdifficulty\tcategory\tvariants\n")
+        for row in rows:
+            f.write("\t".join(row) + "\n")
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    source = tmp_path / "lexicon.tsv"
+    _write_tsv(source, ROWS)
+    return Lexicon(str(source))
+
+
+def test_index_is_built_on_first_query_and_keeps_file_order(lexicon):
+    assert not os.path.exists(lexicon.index_path)
+    assert len(lexicon) == 4
+    assert os.path.exists(lexicon.index_path)
+
+    assert [entry["word"] for entry in lexicon] == ["hello", "water", "beautiful", "goodbye"]
+    assert lexicon[0]["word"] == "hello"
+    assert lexicon[-1] == {"word": "goodbye", "phonetic": "ɡʊdˈbaɪ", "difficulty": "medium", "category": "greetings"}
+    with pytest.raises(IndexError):
+        lexicon[4]
+
+
+def test_indexed_lookups(lexicon):
+    assert lexicon.get("WATER")["phonetic"] == "ˈwɔːtər"
+    assert lexicon.get("fire") is None
+    assert "hello" in lexicon
+
+    assert [e["word"] for e in lexicon.words_in_category("greetings")] == ["hello", "goodbye"]
+    assert [e["word"] for e in lexicon.words_in_category("greetings", difficulty="easy")] == ["hello"]
+    assert [e["word"] for e in lexicon.words_by_difficulty("easy", limit=1)] == ["hello"]
+
+    assert sorted(lexicon.variants("hello")) == ["hallo", "hellow"]
+    assert lexicon.is_accepted_variant("Hello", "HELLOW")
+    assert not lexicon.is_accepted_variant("water", "hallo")
+    assert [(word, sorted(variants)) for word, variants in lexicon.iter_variants()] == [
+        ("hello", ["hallo", "hellow"]), ("beautiful", ["beautyful"])
+    ]
+
+
+def test_index_is_rebuilt_when_the_source_is_newer(lexicon):
+    assert len(lexicon) == 4
+    built_at = os.path.getmtime(lexicon.index_path)
+
+    _write_tsv(lexicon.source_path, ROWS + [("orange", "ˈɔːrɪndʒ", "easy", "colors", "")])
+    os.utime(lexicon.source_path, (built_at + 10, built_at + 10))
+
+    fresh = Lexicon(lexicon.source_path)
+    assert len(fresh) == 5
+    assert fresh.get("orange")["category"] == "colors"
@@ -0,0 +1,47 @@
+# backend/python-service/test_phonetic.py
+
+import random
+
+from phonetic import BKTree, PhoneticMatcher, phonetic_key, weighted_edit_distance
+
+WORDS = ["red", "read", "bread", "blue", "blew", "glue", "green", "grain", "yellow", "orange",
+         "purple", "pink", "ping", "brown", "crown", "round", "water", "waiter", "apple", "ample"]
+
+
+def _brute_force(key, max_distance):
+    results = set()
+    for word in WORDS:
+        word_key = phonetic_key(word)
+        if word_key and weighted_edit_distance(key, word_key) <= max_distance:
+            results.add(word)
+    return results
+
+
+def test_bktree_search_matches_a_linear_scan():
+    words = list(WORDS)
+    random.Random(7).shuffle(words)
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+
+    for query in ["red", "blu", "grean", "pinc", "browne", "wadder", "xyz"]:
+        key = phonetic_key(query)
+        for max_distance in (0, 1, 2, 3):
+            found = {word for _, word in tree.search(key, max_distance)}
+            assert found == _brute_force(key, max_distance), (query, max_distance)
+
+
+def test_words_with_the_same_key_share_a_node():
+    assert phonetic_key("blue") == phonetic_key("blew")
+    tree = BKTree()
+    tree.add("blue")
+    tree.add("blew")
+    assert len(tree) == 1
+    assert sorted(word for _, word in tree.search(phonetic_key("blue"), 0)) == ["blew", "blue"]
+
+
+def test_matcher_candidates_rank_the_intended_word_first():
+    matcher = PhoneticMatcher(WORDS)
+    assert matcher.candidates("grean", limit=3)[0][0] == "green"
+    assert matcher.is_match("red", "red")
+    assert not matcher.is_match("purple", "red")
@@ -0,0 +1,73 @@
+# backend/python-service/test_scheduler.py
+
+from scheduler import FIRST_INTERVAL, RELEARN_INTERVAL, SECOND_INTERVAL, SpacedRepetitionScheduler
+
+WORDS = [
+    {"word": "apple", "difficulty": "medium"},
+    {"word": "banana", "difficulty": "medium"},
+    {"word": "cherry", "difficulty": "medium"},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_new_words_in_bank_order_then_due_reviews_first():
+    clock = FakeClock()
+    scheduler = SpacedRepetitionScheduler(WORDS, clock=clock)
+    assert scheduler.next_word()["word"] == "apple"
+
+    scheduler.record_result("apple", 0.2)
+    assert scheduler.next_word()["word"] == "banana"
+
+    clock.now += RELEARN_INTERVAL
+    assert scheduler.next_word()["word"] == "apple"
+
+
+def test_intervals_follow_the_sm2_ladder():
+    clock = FakeClock()
+    scheduler = SpacedRepetitionScheduler(WORDS, clock=clock)
+
+    assert scheduler.record_result("apple", 1.0).interval == FIRST_INTERVAL
+    assert scheduler.record_result("apple", 1.0).interval == SECOND_INTERVAL
+    third = scheduler.record_result("apple", 1.0)
+    assert third.interval == SECOND_INTERVAL * third.ease
+
+    failed = scheduler.record_result("apple", 0.0)
+    assert failed.interval == RELEARN_INTERVAL
+    assert (failed.repetitions, failed.lapses) == (0, 1)
+    assert failed.due == clock.now + RELEARN_INTERVAL
+
+
+def test_rescheduled_words_are_not_returned_from_stale_heap_entries():
+    clock = FakeClock()
+    scheduler = SpacedRepetitionScheduler(WORDS, clock=clock)
+    for word in ("apple", "banana", "cherry"):
+        scheduler.record_result(word, 0.0)
+    # apple is pushed far out; its old (earliest) heap entry must be skipped
+    scheduler.record_result("apple", 1.0)
+
+    clock.now += RELEARN_INTERVAL
+    assert scheduler.next_word()["word"] == "banana"
+    assert scheduler.next_word(due_only=True)["word"] == "banana"
+
+
+def test_history_replay_matches_live_recording():
+    attempts = [("apple", 0.9, 1000.0), ("banana", 0.1, 1010.0), ("apple", 0.7, 1700.0)]
+    replayed = SpacedRepetitionScheduler(WORDS)
+    replayed.load_history(attempts)
+
+    live = SpacedRepetitionScheduler(WORDS)
+    for word, score, timestamp in attempts:
+        live.record_result(word, score, timestamp)
+
+    for word in ("apple", "banana"):
+        assert replayed.word_state(word) == live.word_state(word)
+    assert replayed.word_state("cherry") is None
+    # Words outside the bank are ignored
+    assert replayed.record_result("durian", 1.0) is None
@@ -0,0 +1,94 @@
+# backend/python-service/warmup.py
+
+import io
+import threading
+import time
+
+# main must be imported before librosa: it points numba's on-disk cache at
+# WARMUP_SETTINGS["numba_cache_dir"] so compiled kernels survive restarts
+import main
+import soundfile as sf
+from decoding import decode_pcm
+from synthetic_audio import synthetic_clip
+from config import WARMUP_SETTINGS
+
+# Shared warm-up status. A worker forked from an already warm master inherits "ready".
+WARMUP_STATE = {
+    "status": "pending",   # pending -> warming -> ready (or failed)
+    "seconds": None,
+    "rounds": 0,
+    "round_ms": [],
+    "error": None
+}
+_start_lock = threading.Lock()
+
+
+def _wav_clips():
+    """One WAV upload body per (duration, sample rate) pair the service typically receives."""
+    clips = []
+    for rate in WARMUP_SETTINGS["source_sample_rates"]:
+        for duration in WARMUP_SETTINGS["clip_durations"]:
+            buffer = io.BytesIO()
+            sf.write(buffer, synthetic_clip(duration, rate), rate, format="WAV")
+            clips.append(buffer.getvalue())
+    return clips
+
+
+def warm_up():
+    """
+    Push synthetic clips through the full request path (WAV decode, resampling,
+    feature extraction in analyze_audio_for_api, model) until latency settles,
+    so librosa's filterbanks and FFT plans, numba's kernels and the model's
+    first-call overhead are all paid before real traffic arrives.
+
+    Rounds repeat until one is within `tolerance` of the previous round (at most
+    `max_rounds`). Returns the elapsed time in seconds.
+    """
+    WARMUP_STATE["status"] = "warming"
+    started = time.perf_counter()
+
+    try:
+        clips = _wav_clips()
+        previous_ms = None
+
+        for _ in range(WARMUP_SETTINGS["max_rounds"]):
+            round_started = time.perf_counter()
+            for clip in clips:
+                samples = decode_pcm(clip)
+                main.analyze_audio_for_api(samples, "hello")
+                # Without a trained model the API path stops before feature extraction
+                if main.PRONUNCIATION_MODEL is None:
+                    main.ANALYZER.extract_audio_features(samples)
+            round_ms = (time.perf_counter() - round_started) * 1000
+
+            WARMUP_STATE["rounds"] += 1
+            WARMUP_STATE["round_ms"].append(round(round_ms, 1))
+            # Settled once two consecutive rounds are within tolerance of each other
+            # (a round that is still much faster than the last one is not settled)
+            if previous_ms is not None and abs(round_ms - previous_ms) <= WARMUP_SETTINGS["tolerance"] * previous_ms:
+                break
+            previous_ms = round_ms
+
+        WARMUP_STATE["status"] = "ready"
+    except Exception as e:
+        # A failed warm-up must not keep the service out of rotation forever
+        print(f"ERROR: Warm-up failed, serving cold: {e}")
+        WARMUP_STATE["status"] = "failed"
+        WARMUP_STATE["error"] = str(e)
+
+    WARMUP_STATE["seconds"] = round(time.perf_counter() - started, 3)
+    return WARMUP_STATE["seconds"]
+
+
+def start_background_warm_up():
+    """Start warm-up in a background thread unless it has already run (or is running)."""
+    with _start_lock:
+        if WARMUP_STATE["status"] != "pending":
+            return
+        WARMUP_STATE["status"] = "warming"
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+def is_ready():
+    """True once warm-up has finished (a failed warm-up also counts, to avoid a dead service)."""
+    return WARMUP_STATE["status"] in ("ready", "failed")
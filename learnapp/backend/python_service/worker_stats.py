@@ -0,0 +1,114 @@
+# backend/python-service/worker_stats.py
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Each server process drops a small JSON file here describing itself (pid, role,
+# warm-up / boot time). Any worker can then report on all of its siblings by
+# reading the directory and sampling their memory from /proc.
+STATS_DIR = os.environ.get(
+    "PRONUNCIATION_WORKER_STATS_DIR",
+    os.path.join(tempfile.gettempdir(), "pronunciation-service-workers")
+)
+
+
+def _stats_path(pid):
+    return os.path.join(STATS_DIR, f"{pid}.json")
+
+
+def reset_stats_dir():
+    """Remove files left behind by a previous server run (called once by the master)."""
+    os.makedirs(STATS_DIR, exist_ok=True)
+    for name in os.listdir(STATS_DIR):
+        if name.endswith(".json"):
+            os.remove(os.path.join(STATS_DIR, name))
+
+
+def record_process(role: str, **details):
+    """Write (or overwrite) this process's stats file."""
+    os.makedirs(STATS_DIR, exist_ok=True)
+    stats = {"pid": os.getpid(), "role": role, "started_at": time.time(), **details}
+    tmp_path = _stats_path(os.getpid()) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(stats, f)
+    os.replace(tmp_path, _stats_path(os.getpid()))
+
+
+def forget_process(pid):
+    """Remove the stats file of a process that has exited."""
+    try:
+        os.remove(_stats_path(pid))
+    except FileNotFoundError:
+        pass
+
+
+def process_memory(pid):
+    """
+    Memory of a process in MB: rss, plus pss/shared/private where the kernel
+    reports them (Linux). Pages shared copy-on-write with the master show up in
+    "shared"; "private" is what the worker really costs on top of it.
+    """
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                    break
+    except OSError:
+        if pid != os.getpid():
+            return None
+        return _own_peak_rss()
+
+    fields = {"Pss:": "pss_mb", "Shared_Clean:": "shared_mb", "Shared_Dirty:": "shared_mb",
+              "Private_Clean:": "private_mb", "Private_Dirty:": "private_mb"}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                name = fields.get(parts[0])
+                if name:
+                    memory[name] = memory.get(name, 0.0) + int(parts[1]) / 1024
+    except OSError:
+        pass
+    return {name: round(value, 1) for name, value in memory.items()}
+
+
+def _own_peak_rss():
+    """Fallback without /proc: peak RSS of the current process, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return {}
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"max_rss_mb": round(maxrss / divisor, 1)}
+
+
+def collect():
+    """Stats and live memory for every registered server process still running."""
+    processes = []
+    if os.path.isdir(STATS_DIR):
+        for name in sorted(os.listdir(STATS_DIR)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(STATS_DIR, name)) as f:
+                    stats = json.load(f)
+            except (OSError, ValueError):
+                continue
+            memory = process_memory(stats["pid"])
+            if memory is None:
+                # The process is gone (e.g. killed without running its exit hook)
+                continue
+            stats["memory"] = memory
+            processes.append(stats)
+
+    # Running without the production server (e.g. `python server.py`): report ourselves
+    if not any(stats["pid"] == os.getpid() for stats in processes):
+        processes.append({"pid": os.getpid(), "role": "standalone", "memory": process_memory(os.getpid())})
+    return processes
@@ -1,38 +1,24 @@
 # Configuration settings for the Pronunciation Assistant
 
-# Word database configuration
-WORD_DATABASE = [
-    {
-        "word": "hello",
-        "phonetic": "həˈloʊ", 
-        "difficulty": "easy",
-        "category": "greetings"
-    },
-    {
-        "word": "beautiful",
-        "phonetic": "ˈbjuːtɪfəl",
-        "difficulty": "medium", 
-        "category": "adjectives"
-    },
-    {
-        "word": "technology",
-        "phonetic": "tekˈnɑːlədʒi",
-        "difficulty": "medium",
-        "category": "nouns"
-    },
-    {
-        "word": "entrepreneur", 
-        "phonetic": "ˌɑːntrəprəˈnɜːr",
-        "difficulty": "hard",
-        "category": "professions"
-    },
-    {
-        "word": "pronunciation",
-        "phonetic": "prəˌnʌnsiˈeɪʃən",
-        "difficulty": "hard",
-        "category": "language"
-    }
-]
+import os
+
+# Word lexicon: shared with the API service, one TSV row per word
+# (word, IPA, difficulty, category, accepted variants) - see python_service/lexicon.py
+LEXICON_SETTINGS = {
+    "source_path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python_service", "data", "lexicon.tsv"),
+    "index_path": None  # defaults to lexicon.db next to the source
+}
+
+# Tutor results, logged with the service's attempt store (python_service/attempt_store.py)
+# and replayed on startup, so spaced repetition carries over from one run to the next
+ATTEMPT_STORE_SETTINGS = {
+    "db_path": os.path.join(os.path.dirname(os.path.abspath(__file__)), "tutor_attempts.db"),
+    "batch_size": 64,
+    "flush_interval": 0.05
+}
+TUTOR_SETTINGS = {
+    "learner_id": os.environ.get("PRONUNCIATION_LEARNER", "local")  # one history per learner sharing the file
+}
 
 # Audio settings
 AUDIO_SETTINGS = {
@@ -9,13 +9,36 @@ import tempfile
 import os
 import time
 import json
+import sys
+
+# Shared service modules (scheduler, lexicon, ...) live next door in python_service.
+# Appended, not prepended, so this folder's own config.py keeps precedence.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python_service"))
+from scheduler import SpacedRepetitionScheduler
+from lexicon import Lexicon
+from phonetic import PhoneticMatcher
+from attempt_store import AttemptStore
+from config import LEXICON_SETTINGS, RECOGNITION_SETTINGS, ATTEMPT_STORE_SETTINGS, TUTOR_SETTINGS
 
 class PronunciationAssistant:
     def __init__(self):
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
         self.words_database = self.load_words_database()
-        self.current_word_index = 0
+        # Sound-alike index over the lexicon for near-miss feedback (cached on disk after the first build)
+        self.matcher = PhoneticMatcher.for_lexicon(
+            self.words_database, threshold=RECOGNITION_SETTINGS["similarity_threshold"]
+        )
+        self.current_word = None
+        # Picks the next word from the learner's per-word history instead of walking the list;
+        # results are logged and replayed here, so earlier runs count too
+        self.learner_id = TUTOR_SETTINGS["learner_id"]
+        self.attempt_store = AttemptStore(**ATTEMPT_STORE_SETTINGS)
+        self.scheduler = SpacedRepetitionScheduler(self.words_database)
+        self.scheduler.load_history(
+            (word, score, created_at)
+            for _, word, score, created_at in self.attempt_store.user_attempts_since(self.learner_id)
+        )
         
         # Initialize pygame for audio playback
         pygame.mixer.init()
@@ -27,20 +50,8 @@ class PronunciationAssistant:
         print("Microphone calibrated!")
     
     def load_words_database(self):
-        """Load words with their phonetic pronunciations"""
-        words = [
-            {"word": "hello", "phonetic": "həˈloʊ", "difficulty": "easy"},
-            {"word": "beautiful", "phonetic": "ˈbjuːtɪfəl", "difficulty": "medium"},
-            {"word": "entrepreneur", "phonetic": "ˌɑːntrəprəˈnɜːr", "difficulty": "hard"},
-            {"word": "technology", "phonetic": "tekˈnɑːlədʒi", "difficulty": "medium"},
-            {"word": "pronunciation", "phonetic": "prəˌnʌnsiˈeɪʃən", "difficulty": "hard"},
-            {"word": "computer", "phonetic": "kəmˈpjuːtər", "difficulty": "easy"},
-            {"word": "algorithm", "phonetic": "ˈælɡərɪðəm", "difficulty": "medium"},
-            {"word": "artificial", "phonetic": "ˌɑːrtɪˈfɪʃəl", "difficulty": "medium"},
-            {"word": "intelligence", "phonetic": "ɪnˈtelɪdʒəns", "difficulty": "medium"},
-            {"word": "machine", "phonetic": "məˈʃiːn", "difficulty": "easy"}
-        ]
-        return words
+        """Open the shared word lexicon (entries are read from disk on demand)"""
+        return Lexicon(**LEXICON_SETTINGS)
     
     def text_to_speech(self, text):
         """Convert text to speech using gTTS"""
@@ -109,6 +120,11 @@ class PronunciationAssistant:
         if self.is_similar_pronunciation(target_lower, user_lower):
             return True, "Good pronunciation!"
         
+        # A sound-alike that is a different word ("rod" for "red") is still wrong;
+        # the phonetic index only points out which words the attempt sounded like
+        near_misses = [word for word, _ in self.matcher.candidates(user_lower, limit=3) if word != target_lower]
+        if near_misses:
+            return False, f"Expected: {target_word} (it sounded like: {', '.join(near_misses)})"
         return False, f"Expected: {target_word}"
     
     def is_similar_pronunciation(self, target, user_input):
@@ -129,19 +145,17 @@ class PronunciationAssistant:
         if target_base == user_base:
             return True
         
-        # Allow for common mispronunciations
-        common_variations = {
-            'hello': ['hallo', 'hellow'],
-            'beautiful': ['beautyful', 'beutiful'],
-            'technology': ['teknology', 'technolgy'],
-            'computer': ['compyuter', 'computor']
-        }
-        
-        if target in common_variations and user_input in common_variations[target]:
+        # Allow for common mispronunciations listed in the lexicon
+        if self.words_database.is_accepted_variant(target, user_input):
             return True
         
         return False
     
+    def record_result(self, word, score):
+        """Reschedule the word and log the result for the next run."""
+        self.scheduler.record_result(word, score)
+        self.attempt_store.record_attempt(self.learner_id, word, score)
+    
     def teach_word(self, word_data):
         """Teach a word to the user"""
         word = word_data["word"]
@@ -157,8 +171,8 @@ class PronunciationAssistant:
         self.text_to_speech(word)
         time.sleep(1)
         
-        # Ask user to pronounce
-        max_attempts = 3
+        # Ask user to pronounce (more tries for words the learner keeps missing, fewer for mastered ones)
+        max_attempts = self.scheduler.max_attempts(word)
         for attempt in range(max_attempts):
             print(f"\nAttempt {attempt + 1}/{max_attempts}")
             user_pronunciation = self.listen_to_user()
@@ -169,6 +183,9 @@ class PronunciationAssistant:
                 if is_correct:
                     print(f"✅ {feedback}")
                     self.text_to_speech("Excellent! Well done!")
+                    # Full marks on the first try, less for each extra attempt needed,
+                    # but any success stays at or above 0.6 (SM-2 quality 3, not a lapse)
+                    self.record_result(word, 1.0 - 0.4 * attempt / max_attempts)
                     return True
                 else:
                     print(f"❌ {feedback}")
@@ -178,6 +195,7 @@ class PronunciationAssistant:
             time.sleep(1)
         
         # If all attempts failed
+        self.record_result(word, 0.0)
         print(f"\n💡 Let's move to the next word. Remember: {word} is pronounced as {phonetic}")
         self.text_to_speech(f"Don't worry! Let's try the next word. Remember, {word} is pronounced as {word}")
         return False
@@ -191,13 +209,16 @@ class PronunciationAssistant:
         self.text_to_speech("Welcome to the Pronunciation Assistant! Let's begin.")
         
         try:
-            for i, word_data in enumerate(self.words_database):
-                self.current_word_index = i
-                print(f"\n📖 Progress: {i+1}/{len(self.words_database)} words")
+            # Keep going while there are new words or reviews due right now
+            word_data = self.scheduler.next_word(due_only=True)
+            while word_data is not None:
+                self.current_word = word_data
+                print(f"\n📖 Progress: {self.scheduler.seen_count}/{len(self.words_database)} words practised")
                 
                 success = self.teach_word(word_data)
+                word_data = self.scheduler.next_word(due_only=True)
                 
-                if i < len(self.words_database) - 1:
+                if word_data is not None:
                     if success:
                         print("\n🎉 Great job! Moving to the next word...")
                         self.text_to_speech("Well done! Here's the next word.")
@@ -216,6 +237,9 @@ class PronunciationAssistant:
         except KeyboardInterrupt:
             print("\n\n👋 Thank you for using the Pronunciation Assistant!")
             self.text_to_speech("Goodbye! Keep practicing!")
+        finally:
+            # Commit the logged results before exiting
+            self.attempt_store.close()
 
 if __name__ == "__main__":
     assistant = PronunciationAssistant()